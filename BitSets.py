@@ -0,0 +1,334 @@
+#Note: This program was written for Python 3.
+#Purpose: The purpose of this code is to store subsets of the ground set [n]
+#as integer bitmasks, so that the matroid and positroid code can do subset,
+#union, difference and size tests with bit operations instead of building
+#frozensets. Element e of [n] is stored in bit e-1, so {1,3} is 0b101.
+#Converters to and from frozensets are given so that callers using the
+#frozenset form still work.
+
+####################################################
+#Converters
+####################################################
+
+#setToMask:
+#Purpose: Convert a set of elements of [n] into a bitmask
+#aSet: an iterable of positive integers
+#returns: (int) the bitmask with bit e-1 set for every e in aSet
+def setToMask(aSet):
+    mask = 0
+    for elem in aSet:
+        if elem < 1:
+            raise ValueError(f'{elem} is not a valid element of a ground set [n]')
+        mask |= 1 << (elem - 1)
+    return mask
+
+#maskToSet:
+#Purpose: Convert a bitmask back into a frozen set
+#mask: (int) a bitmask
+#returns: frozen set of the elements stored in the mask
+def maskToSet(mask):
+    return frozenset(maskElements(mask))
+
+#familyToMasks:
+#Purpose: Convert a family of sets (bases, circuits, etc) into a set of bitmasks
+#family: an iterable of sets
+#returns: set of ints
+def familyToMasks(family):
+    return {setToMask(member) for member in family}
+
+#masksToFamily:
+#Purpose: Convert a family of bitmasks back into a set of frozen sets
+#masks: an iterable of ints
+#returns: set of frozen sets
+def masksToFamily(masks):
+    return {maskToSet(mask) for mask in masks}
+
+#necklaceToMasks:
+#Purpose: Convert a Grassmann necklace (list of frozen sets) into a list of
+#bitmasks, keeping the order and repeats of the necklace
+#necklace: list of frozen sets
+#returns: list of ints
+def necklaceToMasks(necklace):
+    return [setToMask(element) for element in necklace]
+
+#masksToNecklace:
+#Purpose: Convert a list of bitmasks back into a Grassmann necklace
+#masks: list of ints
+#returns: list of frozen sets
+def masksToNecklace(masks):
+    return [maskToSet(mask) for mask in masks]
+
+####################################################
+#Bit operations
+####################################################
+
+#groundMask:
+#Purpose: the bitmask of the whole ground set [n]
+#n: (int) the size of the ground set
+def groundMask(n):
+    return (1 << n) - 1
+
+#elementMask:
+#Purpose: the bitmask of the single element set {e}
+#e: (int) an element of [n]
+def elementMask(e):
+    return 1 << (e - 1)
+
+#maskSize:
+#Purpose: the number of elements stored in a bitmask
+#mask: (int) a bitmask
+def maskSize(mask):
+    return mask.bit_count()
+
+#isSubmask:
+#Purpose: check whether the set stored in maskA is a subset of the one in maskB
+#maskA: (int) a bitmask
+#maskB: (int) a bitmask
+#returns: boolean
+def isSubmask(maskA, maskB):
+    return maskA & ~maskB == 0
+
+#maskRangeCheck:
+#Purpose: the bitmask analogue of rangeCheck, check that every
+#element of the mask is in [n]
+#mask: (int) a bitmask
+#n: positive integer against which to be checked
+#returns: boolean
+def maskRangeCheck(mask, n):
+    if n < 1:
+        raise ValueError(f'[{n}] not a valid set of a positroid')
+    return mask >> n == 0
+
+#maskElements:
+#Purpose: list the elements stored in a bitmask, smallest first
+#mask: (int) a bitmask
+#returns: list of ints
+def maskElements(mask):
+    elements = []
+    while mask:
+        lowBit = mask & -mask
+        elements.append(lowBit.bit_length())
+        mask ^= lowBit
+    return elements
+
+#lowestElement:
+#Purpose: the smallest element stored in a non-empty bitmask
+#mask: (int) a non-zero bitmask
+def lowestElement(mask):
+    return (mask & -mask).bit_length()
+
+#kSubsetMasks:
+#Purpose: generate the bitmasks of every k element subset of [n].
+#   The masks are produced in increasing numerical order (colex order on
+#   the sets) using Gosper's hack, so no intermediate tuples are built.
+#n: (int) the size of the ground set
+#k: (int) the size of the subsets
+#returns: generator of ints
+def kSubsetMasks(n, k):
+    if k < 0 or k > n:
+        return
+    if k == 0:
+        yield 0
+        return
+    mask = (1 << k) - 1
+    limit = 1 << n
+    while mask < limit:
+        yield mask
+        lowBit = mask & -mask
+        ripple = mask + lowBit
+        mask = (((ripple ^ mask) >> 2) // lowBit) | ripple
+
+####################################################
+#Cyclic orders
+####################################################
+
+#rotateMask:
+#Purpose: The bitmask analogue of cyclicShift. Rotate a mask so that
+#   the element i of [n] sits in bit 0, i.e. the bits of the result
+#   are in the <_i order i, i+1, ..., n, 1, ..., i-1.
+#mask: (int) a bitmask over [n]
+#n: size of the cycle
+#i: linear order of interest
+def rotateMask(mask, n, i):
+    if i > n or i < 1:
+        raise ValueError('i must be in [1, n]')
+    shift = i - 1
+    return ((mask >> shift) | (mask << (n - shift))) & ((1 << n) - 1)
+
+#reverseMask:
+#Purpose: reverse the order of [n] in a bitmask, so element e goes to the
+#   bit of n+1-e
+#mask: (int) a bitmask over [n]
+#n: size of the ground set
+def reverseMask(mask, n):
+    reversedMask = 0
+    for e in maskElements(mask):
+        reversedMask |= elementMask(n + 1 - e)
+    return reversedMask
+
+#compareMasks:
+#Purpose: The bitmask analogue of compareSets for two sets of the same
+#   size. Returns 1 if maskA is bigger than maskB, -1 if it is smaller,
+#   and 0 if they are equal, in the lexicographic order induced by <_i.
+#   For sets of the same size the lex order is decided by the first
+#   element (in <_i) of the symmetric difference: the set holding it is
+#   the smaller one.
+#maskA: (int) a bitmask
+#maskB: (int) a bitmask of the same size as maskA
+#n: the modulus
+#i: the minimum element
+def compareMasks(maskA, maskB, n, i):
+    difference = rotateMask(maskA ^ maskB, n, i)
+    if difference == 0:
+        return 0
+    firstDifference = difference & -difference
+    if rotateMask(maskA, n, i) & firstDifference:
+        return -1
+    return 1
+
+#shiftedElements:
+#Purpose: list the elements of a bitmask sorted in the <_i order
+#mask: (int) a bitmask over [n]
+#n: size of the cycle
+#i: linear order of interest
+def shiftedElements(mask, n, i):
+    elements = maskElements(mask)
+    cut = 0
+    while cut < len(elements) and elements[cut] < i:
+        cut += 1
+    return elements[cut:] + elements[:cut]
+
+####################################################
+#Subset queries
+####################################################
+
+# SetTrie:
+# Purpose: An index over a family of subsets of [n] (stored as bitmasks)
+#   that answers "is some stored set contained in S" and "which stored
+#   sets contain T" without scanning the whole family. Each set is a
+#   path of its elements in increasing order, so a query only walks the
+#   branches whose elements are allowed by S (or T). Sets can be inserted
+#   and deleted, so a family can be updated in place.
+class SetTrie:
+    # _Node:
+    # children: dict from an element to the node below it
+    # isEnd: whether the path to this node is a stored set
+    class _Node:
+        __slots__ = ("children", "isEnd")
+
+        def __init__(self):
+            self.children = {}
+            self.isEnd = False
+
+    def __init__(self, masks = ()):
+        self._root = SetTrie._Node()
+        self._size = 0
+        for mask in masks:
+            self.insert(mask)
+
+    # fromFamily:
+    # Purpose: build a SetTrie from a family of frozen sets
+    @classmethod
+    def fromFamily(cls, family):
+        return cls(familyToMasks(family))
+
+    def __len__(self):
+        return self._size
+
+    # insert:
+    # Purpose: add a bitmask to the family, returns False if it was there
+    def insert(self, mask):
+        node = self._root
+        for e in maskElements(mask):
+            child = node.children.get(e)
+            if child is None:
+                child = SetTrie._Node()
+                node.children[e] = child
+            node = child
+        if node.isEnd:
+            return False
+        node.isEnd = True
+        self._size += 1
+        return True
+
+    # delete:
+    # Purpose: remove a bitmask from the family, returns False if it was
+    #   not there. Branches left empty are pruned.
+    def delete(self, mask):
+        path = [(None, self._root)]
+        for e in maskElements(mask):
+            child = path[-1][1].children.get(e)
+            if child is None:
+                return False
+            path.append((e, child))
+        if not path[-1][1].isEnd:
+            return False
+        path[-1][1].isEnd = False
+        self._size -= 1
+        for depth in range(len(path) - 1, 0, -1):
+            e, node = path[depth]
+            if node.isEnd or node.children:
+                break
+            del path[depth-1][1].children[e]
+        return True
+
+    def __contains__(self, mask):
+        node = self._root
+        for e in maskElements(mask):
+            node = node.children.get(e)
+            if node is None:
+                return False
+        return node.isEnd
+
+    def __iter__(self):
+        stack = [(self._root, 0)]
+        while stack:
+            node, mask = stack.pop()
+            if node.isEnd:
+                yield mask
+            for e, child in node.children.items():
+                stack.append((child, mask | (1 << (e - 1))))
+
+    # hasSubsetOf:
+    # Purpose: check whether some stored set is a subset of mask
+    def hasSubsetOf(self, mask):
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.isEnd:
+                return True
+            for e, child in node.children.items():
+                if mask >> (e - 1) & 1:
+                    stack.append(child)
+        return False
+
+    # subsetsOf:
+    # Purpose: generate every stored set that is a subset of mask
+    def subsetsOf(self, mask):
+        stack = [(self._root, 0)]
+        while stack:
+            node, path = stack.pop()
+            if node.isEnd:
+                yield path
+            for e, child in node.children.items():
+                if mask >> (e - 1) & 1:
+                    stack.append((child, path | (1 << (e - 1))))
+
+    # supersetsOf:
+    # Purpose: generate every stored set that is a superset of mask
+    def supersetsOf(self, mask):
+        required = maskElements(mask)
+        stack = [(self._root, 0, 0)]
+        while stack:
+            node, path, found = stack.pop()
+            if found == len(required) and node.isEnd:
+                yield path
+            for e, child in node.children.items():
+                if found < len(required):
+                    #elements are stored in increasing order, so once we
+                    #pass the next required element it can not appear
+                    if e > required[found]:
+                        continue
+                    stack.append((child, path | (1 << (e - 1)), found + (e == required[found])))
+                else:
+                    stack.append((child, path | (1 << (e - 1)), found))
@@ -8,17 +8,82 @@
 #import sys
 import math
 import itertools #needed for generate all k element subsets
+import collections
+import contextlib
+import contextvars
+import functools
 from warnings import warn
+from BitSets import *
 #from itertools import chain
 #import functools #needed for custom compare functions
 #import copy
 
 from timeit import default_timer as timer
 
+####################################################
+#Validation levels
+####################################################
+#The public converters check their input before using it. How much they
+#check is set by a validation level:
+#   VALIDATE_FULL: every check, e.g. the basis exchange property or the
+#       Grassmann necklace conditions
+#   VALIDATE_SHAPE: only the cheap checks of the shape of the input: sizes,
+#       lengths and the range of the elements
+#   VALIDATE_TRUSTED: no checks, for data the caller built itself
+#A function taking a validate argument uses that level, and otherwise
+#the current level, which is VALIDATE_FULL unless changed with
+#validationLevel or setValidationLevel.
+
+VALIDATE_FULL = 'full'
+VALIDATE_SHAPE = 'shape'
+VALIDATE_TRUSTED = 'trusted'
+VALIDATION_LEVELS = (VALIDATE_FULL, VALIDATE_SHAPE, VALIDATE_TRUSTED)
+
+_currentValidationLevel = contextvars.ContextVar('validationLevel', default = VALIDATE_FULL)
+
+#resolveValidation:
+#Purpose: the validation level a call should use
+#validate: None for the current level, one of VALIDATION_LEVELS, or a
+#   boolean (True for VALIDATE_FULL, False for VALIDATE_TRUSTED)
+def resolveValidation(validate = None):
+    if validate is None:
+        return _currentValidationLevel.get()
+    if validate is True:
+        return VALIDATE_FULL
+    if validate is False:
+        return VALIDATE_TRUSTED
+    if validate not in VALIDATION_LEVELS:
+        raise ValueError(f'{validate} is not one of the validation levels {VALIDATION_LEVELS}')
+    return validate
+
+#getValidationLevel, setValidationLevel:
+#Purpose: read or change the current validation level
+def getValidationLevel():
+    return _currentValidationLevel.get()
+
+def setValidationLevel(level):
+    _currentValidationLevel.set(resolveValidation(level))
+
+#validationLevel:
+#Purpose: a context manager running its block at a validation level, e.g.
+#   with validationLevel(VALIDATE_TRUSTED):
+#       necklaces = [basesToGrassmannNecklace(bases, n) for bases in family]
+@contextlib.contextmanager
+def validationLevel(level):
+    token = _currentValidationLevel.set(resolveValidation(level))
+    try:
+        yield
+    finally:
+        _currentValidationLevel.reset(token)
+
 ####################################################
 #Matroids
 ####################################################
 
+# EMPTY_BASES_MESSAGE: the error for an empty bases set where a matroid
+#   needs at least one basis
+EMPTY_BASES_MESSAGE = 'the bases set of a matroid must not be empty'
+
 #nonEmptySetCheck:
 #Purpose: Given a set of frozen set, checks that
 #it is not empty
@@ -58,17 +123,74 @@ def hasExchange(setA,setB,bases):
     #check that setA and setB are, indeed, in basis
     if (setA not in bases) or (setB not in bases):
         raise ValueError('One of the candidate sets not in given basis')
-    #calculate the set differences
-    setDiffAMinusB = setA - setB
-    setDiffBMinusA = setB - setA
-
-    addaToSetB = {setB.union({a}) for a in setDiffAMinusB}
-    exchangedSets = {Bcupa-{b} for b in setDiffBMinusA for Bcupa in addaToSetB }
-    exchangedSetsInBases = exchangedSets.intersection(bases)
-    hasExchange=(len(exchangedSetsInBases >0))
-    if not hasExchange:
-        warn(f'{setA} and {setB} do not have a valid exchange')
-    return hasExchange
+    return hasExchangeMasks(setToMask(setA),setToMask(setB),familyToMasks(bases))
+
+# hasExchangeMasks:
+# Purpose: The bitmask version of hasExchange. The exchanged sets
+#       are built with bit operations instead of frozenset unions.
+# maskA: (int) bitmask of a basis
+# maskB: (int) bitmask of a basis
+# baseMasks: set of ints, the bitmasks of the bases.
+# returns: boolean
+def hasExchangeMasks(maskA,maskB,baseMasks):
+    diffBMinusA = maskElements(maskB & ~maskA)
+    for a in maskElements(maskA & ~maskB):
+        AMinusa = maskA & ~elementMask(a)
+        if not any(AMinusa | elementMask(b) in baseMasks for b in diffBMinusA):
+            warn(f'{maskToSet(maskA)} and {maskToSet(maskB)} do not have a valid exchange for {a}')
+            return False
+    return True
+
+# exchangeIndex: (helper function to basisExchangeWitness)
+# Purpose: Index a family of bases by their (k-1)-subsets. For each
+#       basis A and a in A the set A \ {a} is sent to the bitmask of
+#       all x such that (A \ {a}) cup {x} is a basis.
+# baseMasks: an iterable of bitmasks of bases
+# returns: dict from bitmasks to bitmasks
+def exchangeIndex(baseMasks):
+    index = {}
+    for mask in baseMasks:
+        remaining = mask
+        while remaining:
+            lowBit = remaining & -remaining
+            remaining ^= lowBit
+            smaller = mask ^ lowBit
+            index[smaller] = index.get(smaller, 0) | lowBit
+    return index
+
+# basisExchangeWitness:
+# Purpose: Find a pair of candidate bases that breaks the basis
+#       exchange property, i.e. A, B and a in A \ B such that
+#       (A \ {a}) cup {b} is not a basis for any b in B \ A.
+#       Using exchangeIndex, each (A, B, a) is one bitwise and, and the
+#       search stops at the first violation.
+# candidateBases: a set of frozensets
+# returns: None if the exchange property holds, else a tuple
+#       (A, B, a) with A, B frozen sets and a an element of A \ B
+def basisExchangeWitness(candidateBases):
+    witness = basisExchangeWitnessMasks(list(familyToMasks(candidateBases)))
+    if witness is None:
+        return None
+    return (maskToSet(witness[0]), maskToSet(witness[1]), witness[2])
+
+# basisExchangeWitnessMasks:
+# Purpose: The bitmask version of basisExchangeWitness.
+# baseMasks: a list of distinct bitmasks of the same size
+# returns: None, or a tuple (maskA, maskB, a) with a an element of A \ B
+def basisExchangeWitnessMasks(baseMasks):
+    index = exchangeIndex(baseMasks)
+    for maskA in baseMasks:
+        for maskB in baseMasks:
+            AMinusB = maskA & ~maskB
+            if AMinusB == 0:
+                continue
+            BMinusA = maskB & ~maskA
+            while AMinusB:
+                lowBit = AMinusB & -AMinusB
+                AMinusB ^= lowBit
+                if index[maskA ^ lowBit] & BMinusA == 0:
+                    return (maskA, maskB, lowBit.bit_length())
+    return None
 
 # hasBasisExchangeProperty:
 #Purpose: Given a set of sets, determine if
@@ -76,24 +198,19 @@ def hasExchange(setA,setB,bases):
 # candidateBases: a non-empty set of frozensets
 # returns: boolean 
 def hasBasisExchangeProperty(candidateBases):
-    basisPairs = list(itertools.permutations(candidateBases, 2))
-    #Since hasExchange checks only A againts B and not vice-versa we need to order them
-
-    #note that basisPairs will be an empty list if candidateBases has only 
-    #one element in it. Therefore this method will return True in this case
-    #as desired
-    if len(basisPairs) == 0:
-        return True
-    else:
-        for pair in basisPairs:
-            basisExchangeProperty = hasExchange(pair[0],pair[1],candidateBases) 
-    return basisExchangeProperty
+    #note that a single candidate basis has no pairs to check, so this
+    #method will return True in this case as desired
+    witness = basisExchangeWitness(candidateBases)
+    if witness is not None:
+        warn(f'{witness[0]} and {witness[1]} do not have a valid exchange for {witness[2]}')
+        return False
+    return True
 
 #isMatroidBases:
 #Purpose: Check whether or not a candidate bases set is a matroid
 def isMatroidBases(candidateBases):
     emptyMatroid = not nonEmptySetCheck(candidateBases) 
-    nonemptyMatroid = nonEmptySetCheck(candidateBases) & sameSizeCheck(candidateBases) & hasBasisExchangeProperty(candidateBases)
+    nonemptyMatroid = nonEmptySetCheck(candidateBases) and sameSizeCheck(candidateBases) and hasBasisExchangeProperty(candidateBases)
     return (emptyMatroid | nonemptyMatroid)
 
 
@@ -107,33 +224,7 @@ def isMatroidBases(candidateBases):
 # returns: list of sets of frozen sets, each set of size num 
 
 def generateMatroidsSlice(n,k,num):
-    
-    #Check that k <=n
-    if n<k:
-        raise ValueError('k cannot exceed n')
-    if math.comb(n,k)<num:
-        raise ValueError('num cannot exceed nCk')
-
-    #Note: need to treat num = 0 differently so that it returns the set
-    # with an empty frozen set, not an empty set
-
-    if num == 0: #want empty matroid, equivalent to k= 0
-        num = 1
-        k = 0
-
-    groundSet = set(range(1,n+1))
-
-    #get all possible basis elements
-    #namely all k subsets of the groundset
-    basisElements = itertools.combinations(groundSet, k)
-    frozenBasisElements = {frozenset(basis) for basis in basisElements}
-
-    #get all possible matroids with the correct number of bases elements
-    #Note: Making this into a set to avoid ({}, ) data structure
-    #when k  = 0
-    possibleMatroids = itertools.combinations(frozenBasisElements,num)
-    matroids = [set(possibleMatroid) for possibleMatroid in possibleMatroids if isMatroidBases(frozenset(possibleMatroid))]
-    return matroids
+    return list(MatroidSliceEnumerator(n,k,num))
 
 # generateMatroids:
 # Purpose: Create all matroids (including the empty matroids)
@@ -195,57 +286,624 @@ def isMinDependent(candidateSet):
 #Purpose: Given a set of frozensets, determine if
 #          it has the basis exchange property
 # candidateCircuit: a set of frozensets
+# circuitTrie: (optional) a SetTrie of candidateCircuit, so one index
+#          can be shared with the caller
 # returns: boolean 
-def hasCircuitCond3(candidateCircuit):
-    allCircuitPairs = list(itertools.combinations(candidateCircuit, 2))
-    intersectingCircuitPairs = [circuitPair for circuitPair in allCircuitPairs if 
-                                len(circuitPair[0].intersection(circuitPair[1]))>0]
-    if len(intersectingCircuitPairs) > 0:
-        for pair in intersectingCircuitPairs:
-            complementList = [(pair[0].union(pair[1])).difference({elem}) for elem in pair[0].intersection(pair[1])]
-            containsCircuit = [any([circuit.issubset(complements) for circuit in candidateCircuit]) for complements in complementList]                       
-                #   if all([not(circuit.issubset(complement)) for circuit in candidateCircuit]):
-            condition3 = all(containsCircuit)
-            if not(condition3):
-                warn(f'{pair} fails to saitisfy the circuit condition')
-                return(condition3)
-    return(condition3)
+def hasCircuitCond3(candidateCircuit, circuitTrie = None):
+    if circuitTrie is None:
+        circuitTrie = SetTrie.fromFamily(candidateCircuit)
+    circuitMasks = familyToMasks(candidateCircuit)
+    #many pairs give the same set, so each one is looked up once
+    checked = set()
+    for pair in itertools.combinations(circuitMasks, 2):
+        for elem in maskElements(pair[0] & pair[1]):
+            complement = (pair[0] | pair[1]) & ~elementMask(elem)
+            if complement in checked:
+                continue
+            checked.add(complement)
+            if not circuitTrie.hasSubsetOf(complement):
+                warn(f'{(maskToSet(pair[0]), maskToSet(pair[1]))} fails to saitisfy the circuit condition')
+                return(False)
+    return(True)
 
 #isMatroidCircuit:
 #Purpose: Check whether or not a candidate circuit set is a matroid
-def isMatroidCircuit(candidateCircuit):
+#circuitTrie: (optional) a SetTrie of candidateCircuit
+def isMatroidCircuit(candidateCircuit, circuitTrie = None):
     minDependent = isMinDependent(candidateCircuit)
-    conditionThree = hasCircuitCond3(candidateCircuit)
+    conditionThree = hasCircuitCond3(candidateCircuit, circuitTrie)
     return (minDependent & conditionThree)
   
 #matroidClosure:
 #Purpose: implementation of the algorithm to find the largest matroid contained in the
 #independence system given by a set of circuits
+#   Whenever two circuits C1, C2 sharing an element e have no circuit inside
+#   (C1 cup C2) \ {e}, that set is added as a circuit and the circuits
+#   containing it are removed. The intersecting pairs still to be checked are
+#   kept on a worklist: adding a circuit only enqueues its pairs with the
+#   circuits it meets (found through an element to circuits index), and pairs
+#   of removed circuits are dropped when they come off the worklist. A pair
+#   never needs checking twice, since a removed circuit is always replaced by
+#   a subset of itself.
 #circuitSubset: set of frozen sets
+#validate: (optional) the validation level, see resolveValidation
 #output: the circuit set of a matroid (set of frozen sets)
-def matroidClosure(circuitSubset):
-    if not isMinDependent(circuitSubset):
+def matroidClosure(circuitSubset, validate = None):
+    level = resolveValidation(validate)
+    if level == VALIDATE_FULL and not isMinDependent(circuitSubset):
         raise ValueError(f"{circuitSubset} is not a valid minimally dependent set")
-    isMatroid = isMatroidCircuit(circuitSubset)
-    if isMatroid:
+    if level == VALIDATE_SHAPE and frozenset() in circuitSubset:
+        raise ValueError(f"{circuitSubset} contains the empty set")
+    circuits = set()
+    circuitTrie = SetTrie()
+    circuitsContaining = {}
+    worklist = collections.deque()
+
+    def addCircuit(newCircuit):
+        neighbours = set()
+        for e in maskElements(newCircuit):
+            neighbours.update(circuitsContaining.setdefault(e, set()))
+        for circuit in neighbours:
+            worklist.append((newCircuit, circuit))
+        circuits.add(newCircuit)
+        circuitTrie.insert(newCircuit)
+        for e in maskElements(newCircuit):
+            circuitsContaining[e].add(newCircuit)
+
+    def removeCircuit(oldCircuit):
+        circuits.discard(oldCircuit)
+        circuitTrie.delete(oldCircuit)
+        for e in maskElements(oldCircuit):
+            circuitsContaining[e].discard(oldCircuit)
+
+    for mask in familyToMasks(circuitSubset):
+        addCircuit(mask)
+    changed = False
+    while worklist:
+        pair = worklist.popleft()
+        for elem in maskElements(pair[0] & pair[1]):
+            #a circuit of the pair may have been replaced by a smaller one
+            if pair[0] not in circuits or pair[1] not in circuits:
+                break
+            complement = (pair[0] | pair[1]) & ~elementMask(elem)
+            if circuitTrie.hasSubsetOf(complement):
+                continue
+            changed = True
+            for circuit in list(circuitTrie.supersetsOf(complement)):
+                removeCircuit(circuit)
+            addCircuit(complement)
+    if not changed:
         return(circuitSubset)
-    allCircuitPairs = list(itertools.combinations(circuitSubset, 2))
-    intersectingCircuitPairs = [circuitPair for circuitPair in allCircuitPairs if 
-                                len(circuitPair[0].intersection(circuitPair[1]))>0]
-    interimResult = circuitSubset
-    while len(intersectingCircuitPairs)>0:
-        pair = intersectingCircuitPairs[0]
-        complementList = [(pair[0].union(pair[1])).difference({elem}) for elem in pair[0].intersection(pair[1])]
-        for complement in complementList:
-            complementContained = any([circuit.issubset(complement) for circuit in interimResult])
-            if complementContained:
-                intersectingCircuitPairs.remove(pair)
+    return(masksToFamily(circuits))
+
+####################################################
+#Resumable matroid enumeration
+####################################################
+
+#unrankCombination:
+#Purpose: the combination of position index in the order of
+#   itertools.combinations(range(total), size), without listing the
+#   ones before it (combinatorial number system).
+#total, size: non-negative integers, size <= total
+#index: (int) 0 <= index < comb(total, size)
+#returns: list of size increasing ints in range(total)
+def unrankCombination(total, size, index):
+    if index < 0 or index >= math.comb(total, size):
+        raise ValueError(f'{index} is not the index of a {size} subset of {total} things')
+    combination = []
+    candidate = 0
+    for position in range(size):
+        while True:
+            block = math.comb(total-candidate-1, size-position-1)
+            if index < block:
+                break
+            index -= block
+            candidate += 1
+        combination.append(candidate)
+        candidate += 1
+    return combination
+
+#rankCombination:
+#Purpose: the inverse of unrankCombination
+#combination: increasing ints in range(total)
+#total: (int) the number of things chosen from
+def rankCombination(combination, total):
+    size = len(combination)
+    index = 0
+    candidate = 0
+    for position, chosen in enumerate(combination):
+        for skipped in range(candidate, chosen):
+            index += math.comb(total-skipped-1, size-position-1)
+        candidate = chosen+1
+    return index
+
+#_nextCombination: (helper function to MatroidSliceEnumerator)
+#Purpose: advance a combination in place to the next one in the order of
+#   itertools.combinations. Returns False if it was the last one.
+def _nextCombination(combination, total):
+    size = len(combination)
+    for i in reversed(range(size)):
+        if combination[i] != i + total - size:
+            combination[i] += 1
+            for j in range(i+1, size):
+                combination[j] = combination[j-1] + 1
+            return True
+    return False
+
+# MatroidSliceEnumerator:
+# Purpose: The iterator behind generateMatroidsSlice. The candidate bases
+#   sets are the num element subsets of the k subsets of [n] (the k
+#   subsets taken in the order of kSubsetMasks), and position is the
+#   index of the next candidate, so a run can be stopped, saved with
+#   checkpoint() and carried on with fromCheckpoint(), or split into
+#   ranges [start, stop) of candidates for different workers.
+#   n,k,num: as in generateMatroidsSlice
+#   position: the index of the next candidate to check
+#   stop: the index after the last candidate to check
+#   total: the number of candidates
+class MatroidSliceEnumerator:
+    def __init__(self, n, k, num, start = 0, stop = None):
+        #Check that k <=n
+        if n<k:
+            raise ValueError('k cannot exceed n')
+        if math.comb(n,k)<num:
+            raise ValueError('num cannot exceed nCk')
+        self.n = n
+        self.k = k
+        self.num = num
+        #Note: need to treat num = 0 differently so that it returns the set
+        # with an empty frozen set, not an empty set
+        if num == 0: #want empty matroid, equivalent to k= 0
+            num = 1
+            k = 0
+        self._size = num
+        self._candidates = list(kSubsetMasks(n,k))
+        self.total = math.comb(len(self._candidates), num)
+        self.stop = self.total if stop is None else min(stop, self.total)
+        self.position = start
+        self._combination = None
+
+    # checkpoint:
+    # Purpose: the state of the enumeration as a dict of ints, which can
+    #   be stored (e.g. as json) and given to fromCheckpoint
+    def checkpoint(self):
+        return {'n': self.n, 'k': self.k, 'num': self.num,
+                'position': self.position, 'stop': self.stop}
+
+    # fromCheckpoint:
+    # Purpose: carry on an enumeration from a checkpoint
+    @classmethod
+    def fromCheckpoint(cls, token):
+        return cls(token['n'], token['k'], token['num'], token['position'], token['stop'])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self.position < self.stop:
+            if self._combination is None:
+                self._combination = unrankCombination(len(self._candidates), self._size, self.position)
+            baseMasks = [self._candidates[i] for i in self._combination]
+            self.position += 1
+            if self.position < self.stop:
+                _nextCombination(self._combination, len(self._candidates))
+            else:
+                self._combination = None
+            if basisExchangeWitnessMasks(baseMasks) is None:
+                return {maskToSet(mask) for mask in baseMasks}
+        raise StopIteration
+
+####################################################
+#Streaming matroid generation
+####################################################
+#The bases sets of the matroids of rank k on [n] are built by deciding,
+#for each k-subset in the order of kSubsetMasks, whether it is a basis.
+#When a basis is added, every pair (A, B) it forms with an earlier basis
+#and every a in A \ B needs a fixer (A \ {a}) cup {b}, b in B \ A, among
+#the bases. If none is a basis yet, the violation waits at the position
+#of its last fixer, and a family that passes that position without
+#taking a fixer is dropped, together with everything that extends it.
+#So the families are pruned as soon as they can no longer have the
+#exchange property, and nothing but the current family is kept.
+
+# MATROID_CHUNK_SIZE: the default number of matroids per chunk of
+#   iterMatroidChunks
+MATROID_CHUNK_SIZE = 1 << 12
+
+#searchMatroidFamilies:
+#Purpose: the search behind iterMatroidBaseMasks and iterMatroidOrbits.
+#   With a group (see symmetryGroup), a family is also dropped as soon as
+#   it is not the canonical form of its orbit (see isCanonicalFamily).
+#   Families only grow by later subsets, and dropping the last subset of
+#   a canonical family leaves a canonical family, so every canonical
+#   matroid is still reached, once, and no other member of its orbit is.
+#n,k,num: as in iterMatroidBaseMasks, already checked
+#group: (optional) list of permutations of [n], None for no symmetry
+#returns: generator of (tuple of bitmasks, orbit size)
+def searchMatroidFamilies(n, k, num, group = None):
+    if num == 0:
+        yield ((0,), 1)
+        return
+    candidates = list(kSubsetMasks(n,k))
+    position = {mask: t for t, mask in enumerate(candidates)}
+    total = len(candidates)
+    if group is not None:
+        images = [[position[permuteMask(mask, permutation)] for mask in candidates] for permutation in group]
+    family = []
+    familyPositions = []
+    inFamily = set()
+    #pending[t]: the fixer lists of the violations whose last fixer is candidates[t]
+    pending = [[] for t in range(total)]
+
+    def newViolations(new):
+        #every (A, B, a) made by adding new, as the list of its fixers,
+        #unless one of them is already a basis
+        for old in family[:-1]:
+            for maskA, maskB in ((new, old), (old, new)):
+                BMinusA = maskElements(maskB & ~maskA)
+                AMinusB = maskA & ~maskB
+                while AMinusB:
+                    lowBit = AMinusB & -AMinusB
+                    AMinusB ^= lowBit
+                    fixers = [(maskA ^ lowBit) | elementMask(b) for b in BMinusA]
+                    if not any(fixer in inFamily for fixer in fixers):
+                        yield fixers
+
+    def extend(t):
+        if num is not None and (len(family) > num or len(family) + total - t < num):
+            return
+        if t == total:
+            if family:
+                if group is None:
+                    yield (tuple(family), 1)
+                else:
+                    yield (tuple(family), len(group) // familyStabilizer(familyPositions, images))
+            return
+        mask = candidates[t]
+        #take candidates[t] as a basis
+        family.append(mask)
+        familyPositions.append(t)
+        inFamily.add(mask)
+        added = []
+        alive = True
+        for fixers in newViolations(mask):
+            deadline = max(position[fixer] for fixer in fixers)
+            if deadline < t:
+                alive = False
                 break
-            else: #not complementContained case
-                circuitsNotContainingComplement = {circuit for circuit in interimResult if not complement.issubset(circuit)}
-                interimResult = circuitsNotContainingComplement.union({complement})
-                allCircuitPairs = list(itertools.combinations(interimResult, 2))
-                intersectingCircuitPairs = [circuitPair for circuitPair in allCircuitPairs if 
-                                len(circuitPair[0].intersection(circuitPair[1]))>0]
-    return(interimResult)
+            pending[deadline].append(fixers)
+            added.append(deadline)
+        if alive and (group is None or isCanonicalFamily(familyPositions, images)):
+            yield from extend(t+1)
+        for deadline in added:
+            pending[deadline].pop()
+        family.pop()
+        familyPositions.pop()
+        inFamily.discard(mask)
+        #leave candidates[t] out, unless it was the last fixer of a violation
+        if all(any(fixer in inFamily for fixer in fixers) for fixers in pending[t]):
+            yield from extend(t+1)
+
+    yield from extend(0)
+
+#iterMatroidBaseMasks:
+#Purpose: Generate the bases sets of all matroids on [n] of rank k, one at
+#   a time, as tuples of bitmasks (see above for the pruning).
+#n: the size of the ground set
+#k: the size of the basis elements
+#num: (optional) only the matroids with num bases. 0 gives the empty
+#   matroid, as in generateMatroidsSlice. By default every number of bases
+#   from 1 to comb(n,k), as in generateMatroids.
+#returns: generator of tuples of ints
+def iterMatroidBaseMasks(n, k, num = None):
+    if n<k:
+        raise ValueError('k cannot exceed n')
+    if num is not None and math.comb(n,k)<num:
+        raise ValueError('num cannot exceed nCk')
+    for baseMasks, orbitSize in searchMatroidFamilies(n, k, num):
+        yield baseMasks
+
+#iterMatroids:
+#Purpose: iterMatroidBaseMasks with each matroid as a set of frozen sets
+def iterMatroids(n, k, num = None):
+    for baseMasks in iterMatroidBaseMasks(n, k, num):
+        yield {maskToSet(mask) for mask in baseMasks}
+
+#iterMatroidChunks:
+#Purpose: iterMatroidBaseMasks in chunks of packed numpy arrays. Row r of
+#   a chunk is one matroid: bit p (bit p % 64 of word p // 64) is set when
+#   the pth k-subset in the order of kSubsetMasks is a basis. Needs numpy.
+#chunkSize: (int) the number of matroids per chunk, the last may be shorter
+#returns: generator of numpy uint64 arrays of shape (rows, ceil(comb(n,k)/64))
+def iterMatroidChunks(n, k, chunkSize = MATROID_CHUNK_SIZE, num = None):
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('iterMatroidChunks needs numpy')
+    if num == 0:
+        k = 0
+    position = {mask: t for t, mask in enumerate(kSubsetMasks(n,k))}
+    words = max(1, (len(position) + 63) // 64)
+    chunk = numpy.zeros((chunkSize, words), dtype=numpy.uint64)
+    rows = 0
+    for baseMasks in iterMatroidBaseMasks(n, k, num):
+        packed = 0
+        for mask in baseMasks:
+            packed |= 1 << position[mask]
+        for word in range(words):
+            chunk[rows, word] = (packed >> (64*word)) & 0xFFFFFFFFFFFFFFFF
+        rows += 1
+        if rows == chunkSize:
+            yield chunk
+            chunk = numpy.zeros((chunkSize, words), dtype=numpy.uint64)
+            rows = 0
+    if rows:
+        yield chunk[:rows]
+
+#unpackMatroidChunk:
+#Purpose: the matroids of a chunk from iterMatroidChunks, as sets of
+#   frozen sets
+def unpackMatroidChunk(chunk, n, k):
+    subsets = [maskToSet(mask) for mask in kSubsetMasks(n,k)]
+    matroids = []
+    for row in chunk.tolist():
+        packed = 0
+        for word, value in enumerate(row):
+            packed |= value << (64*word)
+        matroids.append({subsets[p] for p in range(len(subsets)) if packed >> p & 1})
+    return matroids
+
+####################################################
+#Matroids up to symmetry
+####################################################
+#A group of permutations of [n] acts on the bases sets. The canonical
+#form of a family is the member of its orbit whose positions in the
+#order of kSubsetMasks, sorted, are lexicographically smallest. The
+#groups are
+#   'cyclic': the rotations i -> i+r of the cyclic order 1 < 2 < ... < n
+#   'dihedral': the rotations and the reflections i -> r-i (mod n), the
+#       symmetries of the cyclic order that positroids respect
+#   'symmetric': every permutation, so one matroid per isomorphism class
+
+SYMMETRY_GROUPS = ('cyclic', 'dihedral', 'symmetric')
+
+#symmetryGroup:
+#Purpose: list the permutations of a symmetry group of [n]
+#n: the size of the ground set
+#symmetry: one of SYMMETRY_GROUPS
+#returns: list of tuples, permutation[e-1] is the image of e. The identity
+#   is first and there are no repeats (for n <= 2 the dihedral group is
+#   smaller than 2n).
+def symmetryGroup(n, symmetry = 'dihedral'):
+    if symmetry not in SYMMETRY_GROUPS:
+        raise ValueError(f'symmetry must be one of {SYMMETRY_GROUPS}, not {symmetry!r}')
+    if symmetry == 'symmetric':
+        return [tuple(e+1 for e in permutation) for permutation in itertools.permutations(range(n))]
+    group = [tuple((e+r) % n + 1 for e in range(n)) for r in range(n)]
+    if symmetry == 'dihedral':
+        group += [tuple((r-e) % n + 1 for e in range(n)) for r in range(n)]
+    return list(dict.fromkeys(group)) or [()]
+
+#permuteMask:
+#Purpose: the image of a bitmask under a permutation of [n]
+#permutation: tuple, permutation[e-1] is the image of e
+def permuteMask(mask, permutation):
+    image = 0
+    for e in maskElements(mask):
+        image |= elementMask(permutation[e-1])
+    return image
+
+#isCanonicalFamily:
+#Purpose: check whether a family is its own canonical form
+#positions: the sorted positions of the family in the order of kSubsetMasks
+#images: images[g][t] is the position of the image of subset t under the
+#   gth permutation
+def isCanonicalFamily(positions, images):
+    for image in images:
+        if sorted(image[t] for t in positions) < positions:
+            return False
+    return True
+
+#familyStabilizer:
+#Purpose: the number of permutations fixing a family, positions and images
+#   as in isCanonicalFamily
+def familyStabilizer(positions, images):
+    fixed = set(positions)
+    return sum(1 for image in images if all(image[t] in fixed for t in positions))
+
+#canonicalMatroid:
+#Purpose: the canonical form of a matroid under a symmetry group
+#matroid: set of frozen sets, the bases
+#n: the size of the ground set
+#symmetry: one of SYMMETRY_GROUPS
+#returns: (set of frozen sets, int) the canonical bases and the orbit size
+def canonicalMatroid(matroid, n, symmetry = 'dihedral'):
+    group = symmetryGroup(n, symmetry)
+    baseMasks = familyToMasks(matroid)
+    if not baseMasks:
+        return (set(), 1)
+    k = maskSize(next(iter(baseMasks)))
+    if any(maskSize(mask) != k for mask in baseMasks):
+        raise ValueError('the bases must all have the same size')
+    position = {mask: t for t, mask in enumerate(kSubsetMasks(n,k))}
+    best = None
+    stabilizer = 0
+    for permutation in group:
+        image = sorted(position[permuteMask(mask, permutation)] for mask in baseMasks)
+        if best is None or image < best:
+            best = image
+        if image == sorted(position[mask] for mask in baseMasks):
+            stabilizer += 1
+    candidates = list(kSubsetMasks(n,k))
+    return ({maskToSet(candidates[t]) for t in best}, len(group) // stabilizer)
+
+#iterMatroidOrbits:
+#Purpose: Generate one matroid on [n] of rank k per orbit of a symmetry
+#   group, with the size of its orbit. Non-canonical families are pruned
+#   during the search, so no orbit is built twice.
+#n,k,num: as in iterMatroidBaseMasks
+#symmetry: one of SYMMETRY_GROUPS
+#masks: (optional boolean) give the bases as a tuple of bitmasks instead of
+#   a set of frozen sets
+#returns: generator of (bases, orbit size). The orbit sizes add up to the
+#   number of matroids from generateMatroids.
+def iterMatroidOrbits(n, k, symmetry = 'dihedral', num = None, masks = False):
+    if n<k:
+        raise ValueError('k cannot exceed n')
+    if num is not None and math.comb(n,k)<num:
+        raise ValueError('num cannot exceed nCk')
+    group = symmetryGroup(n, symmetry)
+    for baseMasks, orbitSize in searchMatroidFamilies(n, k, num, group):
+        if masks:
+            yield (baseMasks, orbitSize)
+        else:
+            yield ({maskToSet(mask) for mask in baseMasks}, orbitSize)
+
+####################################################
+#Rank oracles
+####################################################
+
+# ORACLE_CACHE_SIZE: the default number of ranks a MatroidOracle remembers
+ORACLE_CACHE_SIZE = 1 << 16
+
+# DENSE_RANK_MAX_N: the largest ground set for which a dense rank table
+#   (2^n entries) may be built
+DENSE_RANK_MAX_N = 20
+
+# MatroidOracle:
+# Purpose: Answer rank, independence and closure questions about a
+#   matroid on [n] given by its bases or by its circuits. Sets may be
+#   passed as frozen sets or as bitmasks, and ranks are memoized by
+#   bitmask in a bounded LRU cache. For n <= DENSE_RANK_MAX_N the whole
+#   rank function can instead be stored as a numpy array with
+#   useDenseRankTable, after which every query is a lookup.
+#   Build one with MatroidOracle.fromBases or MatroidOracle.fromCircuits.
+#   n: the size of the ground set
+#   k: the rank of the matroid
+class MatroidOracle:
+    def __init__(self, n, baseMasks = None, circuitTrie = None, cacheSize = ORACLE_CACHE_SIZE):
+        if (baseMasks is None) == (circuitTrie is None):
+            raise ValueError('give exactly one of baseMasks and circuitTrie')
+        self.n = n
+        self._baseMasks = None if baseMasks is None else list(baseMasks)
+        self._circuitTrie = circuitTrie
+        self._denseRanks = None
+        self._cachedRank = functools.lru_cache(maxsize=cacheSize)(self._computeRank)
+        self.k = self._cachedRank(groundMask(n))
+
+    # fromBases:
+    # Purpose: the oracle of a matroid given by its bases set
+    # bases: set of frozen sets (or of bitmasks)
+    # n: the size of the ground set
+    @classmethod
+    def fromBases(cls, bases, n, cacheSize = ORACLE_CACHE_SIZE):
+        baseMasks = {basis if isinstance(basis, int) else setToMask(basis) for basis in bases}
+        if len(baseMasks) == 0:
+            raise ValueError(EMPTY_BASES_MESSAGE)
+        return cls(n, baseMasks = baseMasks, cacheSize = cacheSize)
+
+    # fromCircuits:
+    # Purpose: the oracle of a matroid given by its circuit set
+    # circuits: set of frozen sets, or a SetTrie of their bitmasks
+    # n: the size of the ground set
+    @classmethod
+    def fromCircuits(cls, circuits, n, cacheSize = ORACLE_CACHE_SIZE):
+        if not isinstance(circuits, SetTrie):
+            circuits = SetTrie.fromFamily(circuits)
+        return cls(n, circuitTrie = circuits, cacheSize = cacheSize)
+
+    def _computeRank(self, mask):
+        if self._baseMasks is not None:
+            #the rank of S is the largest intersection of S with a basis
+            return max((mask & basis).bit_count() for basis in self._baseMasks)
+        #greedily build a maximal independent subset of S
+        independent = 0
+        for e in maskElements(mask):
+            candidate = independent | elementMask(e)
+            if not self._circuitTrie.hasSubsetOf(candidate):
+                independent = candidate
+        return independent.bit_count()
+
+    # rank:
+    # Purpose: the size of the largest independent subset of aSet
+    # aSet: frozen set or bitmask
+    def rank(self, aSet):
+        mask = aSet if isinstance(aSet, int) else setToMask(aSet)
+        if self._denseRanks is not None:
+            return int(self._denseRanks[mask])
+        return self._cachedRank(mask)
+
+    # isIndependent:
+    # Purpose: check whether aSet is independent
+    # aSet: frozen set or bitmask
+    def isIndependent(self, aSet):
+        mask = aSet if isinstance(aSet, int) else setToMask(aSet)
+        if self._denseRanks is None and self._circuitTrie is not None:
+            return not self._circuitTrie.hasSubsetOf(mask)
+        return self.rank(mask) == mask.bit_count()
+
+    # closureMask:
+    # Purpose: the bitmask of the closure of a bitmask, the elements
+    #   that do not increase its rank
+    def closureMask(self, mask):
+        rank = self.rank(mask)
+        closed = mask
+        for e in range(1, self.n+1):
+            bit = elementMask(e)
+            if not mask & bit and self.rank(mask | bit) == rank:
+                closed |= bit
+        return closed
+
+    # closure:
+    # Purpose: the closure of aSet, as a frozen set
+    # aSet: frozen set or bitmask
+    def closure(self, aSet):
+        mask = aSet if isinstance(aSet, int) else setToMask(aSet)
+        return maskToSet(self.closureMask(mask))
+
+    # cacheInfo:
+    # Purpose: the statistics of the rank cache
+    def cacheInfo(self):
+        return self._cachedRank.cache_info()
 
+    # useDenseRankTable:
+    # Purpose: compute the rank of every subset of [n] at once and keep
+    #   them in a numpy array of 2^n bytes. The independent sets are the
+    #   down-closure of the bases (or the complement of the up-closure of
+    #   the circuits), and rank(S) is the largest independent subset of
+    #   S, both done one element at a time over the whole array.
+    #   Needs numpy and n <= DENSE_RANK_MAX_N.
+    # returns: the numpy array of ranks, indexed by bitmask
+    def useDenseRankTable(self):
+        if self.n > DENSE_RANK_MAX_N:
+            raise ValueError(f'a dense rank table needs n <= {DENSE_RANK_MAX_N}, not {self.n}')
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('useDenseRankTable needs numpy')
+        n = self.n
+        size = 1 << n
+        if self._baseMasks is not None:
+            independent = numpy.zeros(size, dtype=bool)
+            independent[numpy.fromiter(self._baseMasks, dtype=numpy.int64)] = True
+            for e in range(n):
+                view = independent.reshape(-1, 2, 1 << e)
+                view[:, 0, :] |= view[:, 1, :]
+        else:
+            dependent = numpy.zeros(size, dtype=bool)
+            circuitMasks = list(self._circuitTrie)
+            if circuitMasks:
+                dependent[numpy.fromiter(circuitMasks, dtype=numpy.int64)] = True
+            for e in range(n):
+                view = dependent.reshape(-1, 2, 1 << e)
+                view[:, 1, :] |= view[:, 0, :]
+            independent = ~dependent
+        popcounts = numpy.zeros(size, dtype=numpy.uint8)
+        for e in range(n):
+            popcounts.reshape(-1, 2, 1 << e)[:, 1, :] += 1
+        ranks = numpy.where(independent, popcounts, 0).astype(numpy.uint8)
+        for e in range(n):
+            view = ranks.reshape(-1, 2, 1 << e)
+            numpy.maximum(view[:, 1, :], view[:, 0, :], out=view[:, 1, :])
+        self._denseRanks = ranks
+        return ranks
@@ -0,0 +1,155 @@
+#Note: This program was written for Python 3.
+#Purpose: The purpose of this code is to enumerate the Le diagrams (and so
+#the positroids) of [n] of rank k on several processes. The Young shapes in
+#the k*(n-k) box are independent work units ("shards"); shapes with many
+#Le diagrams are split further by the filling of their top row. Each worker
+#runs a callback on every Le diagram of its shard and sends back compact
+#results, which are put back together in shard order, so the output does
+#not depend on the number of workers or on which worker finished first.
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from Positroids import *
+
+####################################################
+#Callbacks
+####################################################
+#A callback takes a LeDiagramView and returns something small and
+#picklable. It has to be a module level function so it can be sent to
+#the worker processes.
+
+#necklaceCallback:
+#Purpose: the Grassmann necklace of the Le diagram, as a tuple of bitmasks
+def necklaceCallback(view):
+    return tuple(necklaceToMasks(leDiagramToGrassmannNecklace(view.leDiagram(), VALIDATE_TRUSTED)))
+
+#dimensionCallback:
+#Purpose: the dimension of the positroid cell of the Le diagram
+def dimensionCallback(view):
+    return view.dimension()
+
+#basesCountCallback:
+#Purpose: the number of bases of the positroid of the Le diagram
+def basesCountCallback(view):
+    necklace = leDiagramToGrassmannNecklace(view.leDiagram(), VALIDATE_TRUSTED)
+    return len(ImplicitPositroid(necklace, VALIDATE_TRUSTED))
+
+#isPositroidCallback:
+#Purpose: check the pipeline on the Le diagram: the bases built from its
+#   necklace must form a positroid with the same necklace.
+def isPositroidCallback(view):
+    n = view.n
+    necklace = leDiagramToGrassmannNecklace(view.leDiagram(), VALIDATE_TRUSTED)
+    bases = grassmannNecklaceToPositroid(necklace)
+    if n == 0 or len(bases) == 0:
+        return True
+    return isPositroid(bases, n) and basesToGrassmannNecklace(bases, n) == necklace
+
+####################################################
+#Shards
+####################################################
+
+# SHARDS_PER_WORKER: how many shards planShards aims for per worker, so
+#   the big shards can be balanced by the many small ones
+SHARDS_PER_WORKER = 16
+
+#planShards:
+#Purpose: Split the Le diagrams in a k*(n-k) box into shards. Each shape is
+#   a shard, unless it has more than total/targetShards diagrams, in which
+#   case it gets one shard per filling of its top row.
+#n,k: non-negative integers, 0 <= k <= n
+#targetShards: (int) about how many shards to make
+#returns: list of (shape, prefixRows, estimatedSize) in enumeration order
+def planShards(n, k, targetShards):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    if n == 0 or k == 0 or n == k:
+        return [(tuple(0 for i in range(k)), (), 1)]
+    maxShardSize = max(1, countLeDiagrams(n, k) // max(1, targetShards))
+    shards = []
+    currentShape = nextYoungDiagram(k, n-k, None)
+    while currentShape is not None:
+        shape = tuple(currentShape)
+        size = countLeDiagramsOfShape(n, k, shape)
+        if size > maxShardSize and shape[0] > 0:
+            topRows = list(plusRowFillings(0, shape[0]))
+            for row in topRows:
+                shards.append((shape, (row,), size / len(topRows)))
+        else:
+            shards.append((shape, (), size))
+        currentShape = nextYoungDiagram(k, n-k, currentShape)
+    return shards
+
+#runShard:
+#Purpose: run a callback over every Le diagram of one shard, and reduce the
+#   results if a reducer is given.
+#n,k: non-negative integers, 0 <= k <= n
+#shard: (shape, prefixRows, estimatedSize) as from planShards
+#callback: a module level function of a LeDiagramView
+#reducer: (optional) a module level function of two results
+#initial: the starting value of the reduction
+#returns: list of results, or the reduced value
+def runShard(n, k, shard, callback, reducer = None, initial = None):
+    shape, prefixRows, estimatedSize = shard
+    if reducer is None:
+        return [callback(view) for view in iterLeDiagramViewsOfShape(n, k, shape, prefixRows)]
+    value = initial
+    for view in iterLeDiagramViewsOfShape(n, k, shape, prefixRows):
+        value = reducer(value, callback(view))
+    return value
+
+####################################################
+#Parallel enumeration
+####################################################
+
+#parallelEnumerate:
+#Purpose: Run a callback on every Le diagram in a k*(n-k) box using a pool
+#   of processes. Shards are handed out from one shared queue, largest
+#   first, so a worker that finishes early picks up the next waiting shard
+#   and the long shards are started before the short ones.
+#   The results come back in the order of iterLeDiagramViews (by shape,
+#   then by top row), whatever the number of workers.
+#n,k: non-negative integers, 0 <= k <= n
+#callback: a module level function of a LeDiagramView, e.g.
+#   necklaceCallback or dimensionCallback
+#reducer: (optional) a module level function combining two results. It
+#   is applied within each shard starting from initial, and then to the
+#   shard values in order, so it should be associative with initial as
+#   its identity (e.g. operator.add with 0).
+#initial: the starting value of the reduction
+#workers: (optional int) the number of processes, default os.cpu_count().
+#   With 1 everything runs in this process.
+#returns: the list of all results, or the reduced value
+def parallelEnumerate(n, k, callback, reducer = None, initial = None, workers = None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shards = planShards(n, k, workers * SHARDS_PER_WORKER)
+    shardResults = [None]*len(shards)
+    if workers == 1:
+        for index, shard in enumerate(shards):
+            shardResults[index] = runShard(n, k, shard, callback, reducer, initial)
+    else:
+        #keep a few shards per worker in flight, biggest first
+        order = sorted(range(len(shards)), key=lambda index: -shards[index][2])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            nextShard = 0
+            while nextShard < len(order) or pending:
+                while nextShard < len(order) and len(pending) < 2*workers:
+                    index = order[nextShard]
+                    future = pool.submit(runShard, n, k, shards[index], callback, reducer, initial)
+                    pending[future] = index
+                    nextShard += 1
+                done, notDone = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    shardResults[pending.pop(future)] = future.result()
+    if reducer is None:
+        results = []
+        for shardResult in shardResults:
+            results.extend(shardResult)
+        return results
+    value = initial
+    for shardResult in shardResults:
+        value = reducer(value, shardResult)
+    return value
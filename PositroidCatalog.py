@@ -0,0 +1,218 @@
+#Note: This program was written for Python 3. It needs numpy.
+#Purpose: The purpose of this code is to store every positroid of [n] of
+#rank k on disk once, so later runs can read them back instead of
+#enumerating the Le diagrams again. The file is a fixed size header
+#followed by fixed width records, sorted by Grassmann necklace:
+#   necklace: n words, the bitmasks of the necklace elements
+#   shape: k bytes, the part lengths of the Le diagram
+#   leRows: k words, the rows of the Le diagram as bitmasks (bit j is the
+#           cell in column j)
+#   dimension: 2 bytes, the number of +'s
+#Words are the smallest unsigned integer type holding n bits. The file is
+#read through mmap as a numpy structured array without copying, and a
+#necklace is looked up by binary search on the sorted records.
+
+import mmap
+import struct
+import numpy
+
+from ParallelEnumeration import parallelEnumerate
+from Positroids import *
+
+####################################################
+#File format
+####################################################
+
+CATALOG_MAGIC = b'PSTRCAT1'
+CATALOG_VERSION = 1
+#magic, version, n, k, word size in bytes, number of records
+CATALOG_HEADER = struct.Struct('<8sHHHHQ')
+#records start here, leaving room for the header to grow. The records
+#are packed (no padding between fields), so their fields are not aligned.
+CATALOG_HEADER_SIZE = 64
+
+#catalogWordType:
+#Purpose: the numpy type of the words holding bitmasks over [n]
+#n: (int) the size of the ground set, at most 64
+def catalogWordType(n):
+    for wordType in (numpy.uint8, numpy.uint16, numpy.uint32, numpy.uint64):
+        if n <= 8*numpy.dtype(wordType).itemsize:
+            return numpy.dtype(wordType).newbyteorder('<')
+    raise ValueError(f'a catalog needs n <= 64, not {n}')
+
+#catalogRecordType:
+#Purpose: the numpy structured type of one record of the (n, k) catalog
+def catalogRecordType(n, k):
+    wordType = catalogWordType(n)
+    return numpy.dtype([('necklace', wordType, (n,)),
+                        ('shape', numpy.uint8, (k,)),
+                        ('leRows', wordType, (k,)),
+                        ('dimension', '<u2')])
+
+####################################################
+#Writing
+####################################################
+
+#catalogRecordCallback:
+#Purpose: the fields of the catalog record of a Le diagram, as a tuple
+#   (necklace masks, shape, row masks, dimension). Module level so it can
+#   be run by parallelEnumerate.
+def catalogRecordCallback(view):
+    necklace = tuple(necklaceToMasks(leDiagramToGrassmannNecklace(view.leDiagram(), VALIDATE_TRUSTED)))
+    rows = list(view.rowMasks()) + [0]*(view.k - len(view.rowMasks()))
+    return (necklace, tuple(view.shape), tuple(rows), view.dimension())
+
+#buildCatalog:
+#Purpose: Enumerate every positroid of [n] of rank k and write the
+#   catalog file.
+#path: the file to write
+#n,k: non-negative integers, 0 <= k <= n <= 64
+#workers: (optional int) processes to enumerate with, see parallelEnumerate
+#returns: (int) the number of records written
+def buildCatalog(path, n, k, workers = 1):
+    recordType = catalogRecordType(n, k)
+    fields = parallelEnumerate(n, k, catalogRecordCallback, workers = workers)
+    records = numpy.zeros(len(fields), dtype=recordType)
+    for index, (necklace, shape, rows, dimension) in enumerate(fields):
+        records[index] = (necklace, shape, rows, dimension)
+    if n > 0 and len(records) > 1:
+        #lexsort uses its last key first, so list the necklace words backwards
+        order = numpy.lexsort([records['necklace'][:, i] for i in reversed(range(n))])
+        records = records[order]
+    header = CATALOG_HEADER.pack(CATALOG_MAGIC, CATALOG_VERSION, n, k,
+                                 catalogWordType(n).itemsize, len(records))
+    with open(path, 'wb') as catalogFile:
+        catalogFile.write(header.ljust(CATALOG_HEADER_SIZE, b'\0'))
+        catalogFile.write(records.tobytes())
+    return len(records)
+
+####################################################
+#Reading
+####################################################
+
+# PositroidCatalog:
+# Purpose: Read access to a catalog file. The records are a numpy
+#   structured array over the memory mapped file, so opening costs only
+#   the header, and each record is turned into the usual frozenset/list
+#   objects only when asked for.
+#   n,k: the ground set size and rank of the catalog
+#   records: the numpy structured array of the records (read only)
+# Use as a context manager, or call close() when done. Arrays taken from
+# records before close() stay valid, and keep the mapping open until they
+# are dropped.
+class PositroidCatalog:
+    def __init__(self, path):
+        self._map = None
+        self.records = None
+        self._file = open(path, 'rb')
+        try:
+            self._open(path)
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self, path):
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            #mmap can not map an empty file
+            raise ValueError(f'{path} is not a positroid catalog')
+        if len(self._map) < CATALOG_HEADER_SIZE:
+            raise ValueError(f'{path} is not a positroid catalog')
+        header = self._map[:CATALOG_HEADER.size]
+        magic, version, n, k, wordBytes, count = CATALOG_HEADER.unpack(header)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            raise ValueError(f'{path} is not a version {CATALOG_VERSION} positroid catalog')
+        if k > n or n > 64:
+            raise ValueError(f'{path} has a bad header: n = {n}, k = {k}')
+        if wordBytes != catalogWordType(n).itemsize:
+            raise ValueError(f'{path} has {wordBytes} byte words, expected {catalogWordType(n).itemsize}')
+        recordType = catalogRecordType(n, k)
+        if len(self._map) < CATALOG_HEADER_SIZE + count*recordType.itemsize:
+            raise ValueError(f'{path} is truncated: the header promises {count} records')
+        self.n = n
+        self.k = k
+        self.records = numpy.frombuffer(self._map, dtype=recordType,
+                                        count=count, offset=CATALOG_HEADER_SIZE)
+
+    def close(self):
+        self.records = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                #views of the records are still alive, the mapping is
+                #closed when the last of them is freed
+                pass
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.records)
+
+    # necklaceMasks:
+    # Purpose: the necklace of record i as a tuple of bitmasks
+    def necklaceMasks(self, i):
+        return tuple(int(mask) for mask in self.records['necklace'][i])
+
+    # necklace:
+    # Purpose: the necklace of record i as a list of frozen sets
+    def necklace(self, i):
+        return masksToNecklace(self.necklaceMasks(i))
+
+    # dimension:
+    # Purpose: the dimension of the positroid cell of record i
+    def dimension(self, i):
+        return int(self.records['dimension'][i])
+
+    # leDiagram:
+    # Purpose: the Le diagram (n,k,filledYoungTab) of record i
+    def leDiagram(self, i):
+        record = self.records[i]
+        filledYoungTab = []
+        for partLength, row in zip(record['shape'], record['leRows']):
+            filledYoungTab.append([(int(row) >> j) & 1 for j in range(int(partLength))])
+        return (self.n, self.k, filledYoungTab)
+
+    # record:
+    # Purpose: record i as a PositroidRecord
+    def record(self, i):
+        return PositroidRecord(self.leDiagram(i), self.necklace(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    # find:
+    # Purpose: the index of the record of a necklace, or None. The records
+    #   are sorted by necklace, so this is a binary search.
+    # necklace: a list of frozen sets, or a tuple of bitmasks
+    def find(self, necklace):
+        key = tuple(mask if isinstance(mask, int) else setToMask(mask) for mask in necklace)
+        if len(key) != self.n:
+            return None
+        low = 0
+        high = len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.necklaceMasks(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.necklaceMasks(low) == key:
+            return low
+        return None
+
+    def __contains__(self, necklace):
+        return self.find(necklace) is not None
+
+#openCatalog:
+#Purpose: open a catalog file, see PositroidCatalog
+def openCatalog(path):
+    return PositroidCatalog(path)
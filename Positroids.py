@@ -9,6 +9,9 @@ import itertools #needed for generate all k element subsets
 from itertools import chain
 import functools #needed for custom compare functions
 import copy
+import random
+import bisect
+import weakref
 
 from timeit import default_timer as timer
 
@@ -26,6 +29,66 @@ def rangeCheck(aSet, number):
         raise ValueError(f'[{number}] not a valid set of a positroid')
     return(all(elem -1 in range(number) for elem in aSet))
 
+#checkBases:
+#Purpose: check a bases set over [n] at a validation level (see
+#resolveValidation), raising a ValueError if it fails
+#matroid: set of frozen sets
+#n: the size of the ground set
+#level: one of VALIDATION_LEVELS
+def checkBases(matroid, n, level):
+    if level == VALIDATE_TRUSTED:
+        return
+    if level == VALIDATE_FULL and not isMatroidBases(matroid):
+        raise ValueError("matroid is not a bases set")
+    if level == VALIDATE_SHAPE and len({len(basis) for basis in matroid}) > 1:
+        raise ValueError("the bases do not all have the same size")
+    if any(not rangeCheck(basis, n) for basis in matroid):
+        raise ValueError("some basis set is not in range")
+
+#checkCircuits:
+#Purpose: check a circuit set over [n] at a validation level
+#circuitTrie: (optional) a SetTrie of matroid, to share with the caller
+def checkCircuits(matroid, n, level, circuitTrie = None):
+    if level == VALIDATE_TRUSTED:
+        return
+    if level == VALIDATE_FULL and not isMatroidCircuit(matroid, circuitTrie):
+        raise ValueError("matroid is not a circuit set")
+    if level == VALIDATE_SHAPE and frozenset() in matroid:
+        raise ValueError("the empty set is not a circuit")
+    if any(not rangeCheck(circuit, n) for circuit in matroid):
+        raise ValueError("some circuit set is not in range")
+
+#checkNecklace:
+#Purpose: check a Grassmann necklace of [n] of rank k at a validation level
+def checkNecklace(necklace, n, k, level):
+    if level == VALIDATE_TRUSTED:
+        return
+    if level == VALIDATE_FULL:
+        if not isGrassmannNecklace(necklace, n, k):
+            raise ValueError("Necklace is not a valid Grassmann Necklace")
+        return
+    if len(necklace) != n or any(len(element) != k for element in necklace) or \
+       any(not rangeCheck(element, n) for element in necklace):
+        raise ValueError(f"Necklace is not n = {n} sets of size {k} in [{n}]")
+
+#checkLeDiagram:
+#Purpose: check a Le diagram (n,k,filledYoungTab) at a validation level.
+#   The shape check is that the parts fit in the k*(n-k) box and do not
+#   increase, without the + property.
+def checkLeDiagram(leDiagram, level):
+    if level == VALIDATE_TRUSTED:
+        return
+    if level == VALIDATE_FULL:
+        if not verifyLeDiagram(leDiagram):
+            raise ValueError(f"{leDiagram} is not a Le diagram")
+        return
+    n, k, filledYoungTab = leDiagram
+    partLengths = [len(part) for part in filledYoungTab]
+    if not 0 <= k <= n or len([part for part in partLengths if part]) > k or \
+       any(part > n-k for part in partLengths) or \
+       any(a < b for a, b in zip(partLengths, partLengths[1:])):
+        raise ValueError(f"{leDiagram} does not have the shape of a Le diagram")
+
 ####################################################
 #Grassman Necklaces
 ####################################################
@@ -120,6 +183,109 @@ def compareSets(setA,setB,n,i):
     else:
         return 0
 
+# GALE_TABLE_CACHE_SIZE: the number of (n, k) rank tables kept by
+#   galeRankTable before the least recently used one is dropped.
+GALE_TABLE_CACHE_SIZE = 16
+
+# GaleRankTable:
+# Purpose: For fixed n and k, give every k-subset of [n] its position
+#          in each of the n cyclically shifted lexicographic orders <_i,
+#          so that comparing two k-subsets in <_i, or finding the
+#          smallest of a family, is done on integers instead of by
+#          calling compareSets.
+#          subsets: tuple of the bitmasks of all k-subsets of [n],
+#                   in colex (numerical) order
+#          position: dict sending a bitmask to its index in subsets
+#          ranks: list of n lists, ranks[i-1][p] is the rank of
+#                 subsets[p] in the <_i order (0 is the smallest)
+# Do not build these directly, use galeRankTable so they are shared.
+class GaleRankTable:
+    def __init__(self, n, k):
+        if k < 0 or k > n:
+            raise ValueError(f'k = {k} must be in [0, {n}]')
+        self.n = n
+        self.k = k
+        self.subsets = tuple(kSubsetMasks(n, k))
+        self.position = {mask: p for p, mask in enumerate(self.subsets)}
+        self.ranks = []
+        self._rankArray = None
+        for i in range(1, n+1):
+            #sorting the elements shifted so that i is 0 gives the <_i lex key
+            shiftedKeys = [sorted((e - i) % n for e in maskElements(mask)) for mask in self.subsets]
+            order = sorted(range(len(self.subsets)), key=shiftedKeys.__getitem__)
+            rank = [0]*len(self.subsets)
+            for r, p in enumerate(order):
+                rank[p] = r
+            self.ranks.append(rank)
+
+    # rank:
+    # Purpose: the rank of a k-subset bitmask in the <_i order
+    def rank(self, mask, i):
+        return self.ranks[i-1][self.position[mask]]
+
+    # minimum:
+    # Purpose: the smallest bitmask of a non-empty family of
+    #          k-subset bitmasks in the <_i order
+    def minimum(self, masks, i):
+        rank = self.ranks[i-1]
+        position = self.position
+        return min(masks, key=lambda mask: rank[position[mask]])
+
+    # rankArray:
+    # Purpose: ranks as a numpy array of shape (n, len(subsets)), row i-1
+    #          lined up with subsets. Built on first use. Needs numpy.
+    def rankArray(self):
+        if self._rankArray is None:
+            try:
+                import numpy
+            except ImportError:
+                raise ImportError('rankArray needs numpy')
+            self._rankArray = numpy.array(self.ranks, dtype=numpy.int64).reshape(self.n, len(self.subsets))
+        return self._rankArray
+
+# galeRankTable:
+# Purpose: Get the GaleRankTable of (n, k). Tables are cached and the
+#          least recently used ones are evicted once more than
+#          GALE_TABLE_CACHE_SIZE have been built. Building a table costs
+#          O(n * C(n,k) log C(n,k)), so only use it when a family will be
+#          compared against many times.
+# n: the size of the ground set
+# k: the size of the subsets
+@functools.lru_cache(maxsize=GALE_TABLE_CACHE_SIZE)
+def galeRankTable(n, k):
+    return GaleRankTable(n, k)
+
+# GALE_TABLE_MAX_SUBSETS: basesToNecklaceMasks only uses the GaleRankTable
+#   of (n, k) when there are at most this many k-subsets, and the bases
+#   are at least half of them
+GALE_TABLE_MAX_SUBSETS = 1 << 14
+
+# basesToNecklaceMasks:
+# Purpose: The Grassmann necklace of a non-empty bases set, as bitmasks.
+#          For a family that is a large part of a small C(n,k) this is a
+#          rank lookup in the GaleRankTable. Otherwise the bases are
+#          compared directly: once the mask is reversed and rotated so the
+#          first element of <_i is the top bit, the lex smallest basis in
+#          <_i has the largest key. That is O(|bases| * n) and builds no
+#          table.
+# baseMasks: a non-empty collection of k-subset bitmasks
+# n: the size of the ground set
+# k: the rank
+# returns: list of ints
+def basesToNecklaceMasks(baseMasks, n, k):
+    subsets = math.comb(n, k)
+    if subsets <= GALE_TABLE_MAX_SUBSETS and 2*len(baseMasks) >= subsets:
+        table = galeRankTable(n, k)
+        return [table.minimum(baseMasks, i) for i in range(1, n+1)]
+    full = groundMask(n)
+    reversedMasks = {reverseMask(mask, n): mask for mask in baseMasks}
+    necklaceMasks = []
+    for shift in range(n):
+        #rotating left by i-1 puts element i in the top bit
+        key = lambda mask: ((mask << shift) | (mask >> (n - shift))) & full
+        necklaceMasks.append(reversedMasks[max(reversedMasks, key=key)])
+    return necklaceMasks
+
 # basesToGrassmannNecklace:
 # Purpose: Given a matroid create the Grassmann Necklace
 #          associated with it.
@@ -131,23 +297,111 @@ def compareSets(setA,setB,n,i):
 # matroid: (set of Frozen sets) bases set of a matroid 
 # n: the size of the ground set, note, we assume that the 
 # matroid is defined over a cyclically ordered set.
+# validate: (optional) the validation level, see resolveValidation
 
-def basesToGrassmannNecklace(matroid,n):
-    if not isMatroidBases(matroid):
-        raise ValueError("matroid is not a bases set")
-    if any([not rangeCheck(basis, n) for basis in matroid]):
-        raise ValueError("some basis set is not in range")
+def basesToGrassmannNecklace(matroid,n,validate = None):
+    checkBases(matroid, n, resolveValidation(validate))
 
     myGrassmanNecklace = []
     if len(matroid) == 0:
         for i in range(1,n+1):
             myGrassmanNecklace.append([])
     else:
-        for i in range(1,n+1):
-            myCompareFunc = lambda x,y: compareSets(x,y,n,i)
-            myGrassmanNecklace.append(min(matroid,key=functools.cmp_to_key(myCompareFunc)))
+        basisOfMask = {setToMask(basis): basis for basis in matroid}
+        k = len(next(iter(matroid)))
+        for mask in basesToNecklaceMasks(basisOfMask, n, k):
+            myGrassmanNecklace.append(basisOfMask[mask])
     return myGrassmanNecklace
 
+# GALE_BATCH_CELLS: how many cells of the membership matrix the batch
+#   necklace code works on at once, to bound its temporary arrays
+GALE_BATCH_CELLS = 1 << 22
+
+# basesMembershipMatrix:
+# Purpose: Store many bases sets on [n] of rank k as a numpy boolean
+#          matrix, one row per matroid and one column per k-subset, in
+#          the order of galeRankTable(n, k).subsets. Needs numpy.
+# matroids: an iterable of bases sets (of frozen sets or of bitmasks)
+# n: the size of the ground set
+# k: the rank
+# returns: numpy array of shape (len(matroids), comb(n, k))
+def basesMembershipMatrix(matroids, n, k):
+    import numpy
+    table = galeRankTable(n, k)
+    #frozen sets cache their hash, so looking them up directly is faster
+    #than converting each one to a bitmask
+    setPosition = {maskToSet(mask): p for p, mask in enumerate(table.subsets)}
+    setPosition.update(table.position)
+    rowIndices = []
+    columnIndices = []
+    rows = 0
+    for matroid in matroids:
+        try:
+            positions = [setPosition[basis] for basis in matroid]
+        except (KeyError, TypeError):
+            try:
+                positions = [table.position[setToMask(basis)] for basis in matroid]
+            except (KeyError, ValueError):
+                raise ValueError(f'the bases of {matroid} are not all {k}-subsets of [{n}]')
+        rowIndices.extend([rows]*len(positions))
+        columnIndices.extend(positions)
+        rows += 1
+    membership = numpy.zeros((rows, len(table.subsets)), dtype=bool)
+    membership[rowIndices, columnIndices] = True
+    return membership
+
+# membershipNecklacePositions:
+# Purpose: The vectorized core of basesToGrassmannNecklaceBatch. For each
+#          row of a membership matrix and each i, the ith necklace element
+#          is the basis of smallest rank in the <_i order, an argmin over
+#          the ith row of the rank array with the non-bases masked out.
+# membership: numpy boolean matrix, as from basesMembershipMatrix
+# n, k: the size of the ground set and the rank
+# returns: numpy int array of shape (rows, n) of positions in
+#          galeRankTable(n, k).subsets, -1 for a row with no bases
+def membershipNecklacePositions(membership, n, k):
+    import numpy
+    table = galeRankTable(n, k)
+    ranks = table.rankArray()
+    columns = len(table.subsets)
+    positions = numpy.empty((membership.shape[0], n), dtype=numpy.int64)
+    chunk = max(1, GALE_BATCH_CELLS // max(1, columns))
+    for start in range(0, membership.shape[0], chunk):
+        block = membership[start:start+chunk]
+        for i in range(n):
+            #non-bases get a rank past every basis
+            masked = numpy.where(block, ranks[i], columns)
+            positions[start:start+chunk, i] = masked.argmin(axis=1)
+    positions[~membership.any(axis=1)] = -1
+    return positions
+
+# basesToGrassmannNecklaceBatch:
+# Purpose: basesToGrassmannNecklace for many matroids on the same [n] and
+#          rank k, with numpy: the matroids become one membership matrix
+#          and each necklace element is a vectorized argmin. The output
+#          is the same list of frozen sets basesToGrassmannNecklace gives.
+# matroids: an iterable of bases sets
+# n: the size of the ground set
+# k: (optional) the rank, by default the size of the first basis
+# validate: (optional) the validation level, see resolveValidation
+# returns: list of Grassmann necklaces, in the order of matroids
+def basesToGrassmannNecklaceBatch(matroids, n, k = None, validate = None):
+    level = resolveValidation(validate)
+    matroids = list(matroids)
+    for matroid in matroids:
+        checkBases(matroid, n, level)
+    if k is None:
+        k = next((len(basis) for matroid in matroids for basis in matroid), 0)
+    subsetSets = [maskToSet(mask) for mask in galeRankTable(n, k).subsets]
+    positions = membershipNecklacePositions(basesMembershipMatrix(matroids, n, k), n, k)
+    necklaces = []
+    for row in positions.tolist():
+        if row and row[0] < 0:
+            necklaces.append([[] for i in range(n)])
+        else:
+            necklaces.append([subsetSets[p] for p in row])
+    return necklaces
+
 # circuitToGrassmannNecklace:
 # Purpose: Given a matroid (as a set of circuits) create the Grassmann Necklace
 #          associated with it.
@@ -159,21 +413,29 @@ def basesToGrassmannNecklace(matroid,n):
 # matroid: (set of Frozen sets) circuit set of a matroid 
 # n: the size of the ground set, note, we assume that the 
 # matroid is defined over a cyclically ordered set.
-
-def circuitToGrassmannNecklace(matroid,n):
-    if not isMatroidCircuit(matroid):
-        raise ValueError("matroid is not a circuit set")
-    if any([not rangeCheck(circuit, n) for circuit in matroid]):
-        raise ValueError("some circuit set is not in range")
+# validate: (optional) the validation level, see resolveValidation
+
+def circuitToGrassmannNecklace(matroid,n,validate = None):
+    circuitTrie = SetTrie.fromFamily(matroid)
+    checkCircuits(matroid, n, resolveValidation(validate), circuitTrie)
+    return oracleToGrassmannNecklace(MatroidOracle.fromCircuits(circuitTrie, n))
+
+# oracleToGrassmannNecklace:
+# Purpose: Given a matroid as a MatroidOracle create the Grassmann
+#          Necklace associated with it. The ith element is built
+#          greedily, adding the elements of [n] in the <i order
+#          whenever they keep the set independent.
+# oracle: a MatroidOracle over a cyclically ordered ground set [n]
+def oracleToGrassmannNecklace(oracle):
+    n = oracle.n
     myGrassmanNecklace = []
     for i in range(1, n+1):
-        GNelem = frozenset({})
+        GNelem = 0
         for v in shiftedRange(n, i):
-            if any([circuit.issubset(GNelem.union(frozenset({v}))) for circuit in matroid]):
-                continue
-            else:
-                GNelem = GNelem.union(frozenset({v}))
-        myGrassmanNecklace.append(GNelem)
+            candidate = GNelem | elementMask(v)
+            if oracle.isIndependent(candidate):
+                GNelem = candidate
+        myGrassmanNecklace.append(maskToSet(GNelem))
     return myGrassmanNecklace
 
 #isGrassmannNecklace:
@@ -216,41 +478,269 @@ def isGrassmannNecklace(GN, n, d):
                 print(f'{i} not in {GN[i-1]} but next element is {nextElem}') 
     return isGN     
 
-# grassmannNecklaceToPositroid:
-# Purpose: Given a Grassmann Necklace create the Positroid
-#          associated with it.
-#          The matroid is created by considering all subsets
-#          of [n] that are size d (the length of each element
-#          in the necklace).
-#          For each set, it is is larger than or equal to each
-#          set s_i in the necklace with respect to <i then it is
-#          included as a basis element in the matroid.
-# necklace: (List of frozen Sets)a Grassmann Necklace
-
-def grassmannNecklaceToPositroid(necklace):
+####################################################
+#Necklace keys
+####################################################
+#A necklace is a list of frozen sets, so it can not be a dict key, and
+#frozenset(necklace) forgets the order and the repeats that make it a
+#necklace. A NecklaceKey is the necklace as a tuple of bitmasks with its
+#hash worked out once. Keys are interned: building the key of a necklace
+#that already has a live key gives back that same object, so equal keys
+#share storage and usually compare by identity. The intern table only
+#holds weak references, so a key is freed once nothing else uses it.
+
+_internedNecklaceKeys = weakref.WeakValueDictionary()
+
+# NecklaceKey:
+# Purpose: An immutable, hashable, interned Grassmann necklace, for sets of
+#          positroids and memo caches.
+#          masks: tuple of the bitmasks of I_1, ..., I_n
+#          n,k: the size of the ground set and the rank
+# necklace: list of frozen sets (or of bitmasks). It is not checked, see
+#           checkNecklace.
+class NecklaceKey:
+    __slots__ = ("masks", "_hash", "__weakref__")
+
+    def __new__(cls, necklace):
+        masks = tuple(element if isinstance(element, int) else setToMask(element) for element in necklace)
+        key = _internedNecklaceKeys.get(masks)
+        if key is None:
+            key = object.__new__(cls)
+            object.__setattr__(key, "masks", masks)
+            object.__setattr__(key, "_hash", hash(masks))
+            _internedNecklaceKeys[masks] = key
+        return key
+
+    def __setattr__(self, name, value):
+        raise AttributeError('NecklaceKey is immutable')
+
+    def __reduce__(self):
+        #unpickling goes through __new__, so the copy is interned too
+        return (NecklaceKey, (self.masks,))
+
+    @property
+    def n(self):
+        return len(self.masks)
+
+    @property
+    def k(self):
+        return self.masks[0].bit_count() if self.masks else 0
+
+    # necklace:
+    # Purpose: the necklace as a list of frozen sets
+    def necklace(self):
+        return masksToNecklace(self.masks)
+
+    def __eq__(self, other):
+        if not isinstance(other, NecklaceKey):
+            return NotImplemented
+        return self is other or self.masks == other.masks
+
+    def __lt__(self, other):
+        if not isinstance(other, NecklaceKey):
+            return NotImplemented
+        return self.masks < other.masks
+
+    def __hash__(self):
+        return self._hash
+
+    def __len__(self):
+        return len(self.masks)
+
+    def __repr__(self):
+        return f'NecklaceKey({self.necklace()})'
+
+# necklaceDistanceMatrix: (helper function to positroidBasisMasks)
+# Purpose: A k-subset B is >= I_i in the Gale order <_i exactly when
+#          every initial interval [i, j] of <_i holds no more elements
+#          of B than of I_i. Writing p_j = |B cap [1, j]|, each of these
+#          conditions is a bound on a difference p_v - p_u, as are
+#          p_0 = 0, p_n = k and 0 <= p_j - p_{j-1} <= 1. This returns the
+#          all-pairs shortest path matrix D of that constraint system,
+#          so that p_v - p_u <= D[u][v] for every basis. The closed system
+#          is decomposable: any values for p_0, ..., p_m that satisfy
+#          these bounds extend to a basis.
+# necklaceMasks: list of bitmasks, a Grassmann necklace
+# n: the size of the ground set
+# k: the rank
+# returns: (n+1)*(n+1) list of lists of ints
+def necklaceDistanceMatrix(necklaceMasks, n, k):
+    infinity = n + 1
+    D = [[0 if u == v else infinity for v in range(n+1)] for u in range(n+1)]
+    def addBound(u, v, bound):
+        if bound < D[u][v]:
+            D[u][v] = bound
+    for j in range(1, n+1):
+        addBound(j-1, j, 1)
+        addBound(j, j-1, 0)
+    addBound(0, n, k)
+    addBound(n, 0, -k)
+    for i in range(1, n+1):
+        GNelement = necklaceMasks[i-1]
+        count = 0
+        for j in shiftedRange(n, i):
+            if GNelement & elementMask(j):
+                count += 1
+            if j >= i:
+                #the interval [i, j] does not wrap: p_j - p_{i-1} <= count
+                addBound(i-1, j, count)
+            else:
+                #the interval [i, n] cup [1, j] wraps: k - p_{i-1} + p_j <= count
+                addBound(i-1, j, count - k)
+    for w in range(n+1):
+        Dw = D[w]
+        for u in range(n+1):
+            Duw = D[u][w]
+            Du = D[u]
+            for v in range(n+1):
+                if Duw + Dw[v] < Du[v]:
+                    Du[v] = Duw + Dw[v]
+    return D
+
+# positroidBasisMasks:
+# Purpose: Generate the bases of the positroid of a Grassmann necklace,
+#          as bitmasks, without scanning all k-subsets of [n].
+#          The elements 1, ..., n are decided in turn, and an element
+#          is only put in (or left out) when the choice still satisfies
+#          the bounds of necklaceDistanceMatrix. Since every such partial
+#          choice extends to a basis, there are no dead ends and the work
+#          is O(n^2) per basis produced.
+# necklaceMasks: list of bitmasks, a valid Grassmann necklace
+# n: the size of the ground set
+# k: the rank
+# returns: generator of ints
+def positroidBasisMasks(necklaceMasks, n, k):
+    if n == 0:
+        yield 0
+        return
+    D = necklaceDistanceMatrix(necklaceMasks, n, k)
+    prefixCounts = [0]*(n+1)
+    def extend(m, mask):
+        if m > n:
+            yield mask
+            return
+        #the allowed values of p_m given p_0, ..., p_{m-1}
+        upper = min(prefixCounts[u] + D[u][m] for u in range(m))
+        lower = max(prefixCounts[u] - D[m][u] for u in range(m))
+        previous = prefixCounts[m-1]
+        if lower <= previous + 1 <= upper:
+            prefixCounts[m] = previous + 1
+            yield from extend(m+1, mask | elementMask(m))
+        if lower <= previous <= upper:
+            prefixCounts[m] = previous
+            yield from extend(m+1, mask)
+    yield from extend(1, 0)
+
+# iterPositroidBases:
+# Purpose: The lazy version of grassmannNecklaceToPositroid, yield the
+#          bases of the positroid of a Grassmann Necklace one at a time.
+#          Only subsets satisfying the Gale conditions are ever built.
+# necklace: (List of frozen Sets) a Grassmann Necklace
+# validate: (optional) the validation level, see resolveValidation
+def iterPositroidBases(necklace, validate = None):
     n = len(necklace)
     if n == 0:
         k = 0
     else:
         k = len(necklace[0])
-    if not isGrassmannNecklace(necklace, n, k):
-        raise ValueError("Necklace is not a valid Grassmann Necklace")
-    myMatroid = set()
-    groundSet = set(range(1,n+1))
-    basisElements = itertools.combinations(groundSet, k)
-    for basis in basisElements:
-        #Note, the next line checks the Gale ordering. Instead of checking whether or not the basis is greater than or equal to the GNelement for all GNelements, it checks whether or not it is less than any of the GN elements in the correct linear order, then negates.
-        isGreaterThan = not any(compareSets(basis, GNelement, n, necklace.index(GNelement)+1) == -1 for GNelement in necklace)
-        '''i = 0
-        isGreaterThan = True
-        while (isGreaterThan and (i<n)):
-            if (compareSets(element,necklace[i],n,i+1) == -1):
-                isGreaterThan = False
-            i += 1'''
-        if isGreaterThan:
-            myMatroid.add(frozenset(basis))
-    return myMatroid
+    checkNecklace(necklace, n, k, resolveValidation(validate))
+    for mask in positroidBasisMasks(necklaceToMasks(necklace), n, k):
+        yield maskToSet(mask)
+
+# grassmannNecklaceToPositroid:
+# Purpose: Given a Grassmann Necklace create the Positroid
+#          associated with it.
+#          The matroid consists of the subsets of [n] of size d (the
+#          length of each element in the necklace) that are larger
+#          than or equal to each set s_i in the necklace in the Gale
+#          order with respect to <i. They are generated directly by
+#          iterPositroidBases rather than by testing every d-subset.
+# necklace: (List of frozen Sets)a Grassmann Necklace
+# validate: (optional) the validation level, see resolveValidation
+
+def grassmannNecklaceToPositroid(necklace, validate = None):
+    return set(iterPositroidBases(necklace, validate))
+
+
+# ImplicitPositroid:
+# Purpose: A positroid given only by its Grassmann Necklace. The bases
+#          are never stored: membership is decided by checking the n
+#          Gale inequalities, iteration goes through positroidBasisMasks,
+#          and the number of bases is counted without keeping them.
+#          Memory is O(nk) instead of O(C(n,k)).
+#          necklace: the Grassmann Necklace (list of frozen sets)
+#          n: the size of the ground set
+#          k: the rank
+# necklace: (List of frozen Sets) a Grassmann Necklace, e.g. the output of
+#           basesToGrassmannNecklace or leDiagramToGrassmannNecklace
+# validate: (optional) the validation level, see resolveValidation
+class ImplicitPositroid:
+    def __init__(self, necklace, validate = None):
+        n = len(necklace)
+        if n == 0:
+            k = 0
+        else:
+            k = len(necklace[0])
+        checkNecklace(necklace, n, k, resolveValidation(validate))
+        self.necklace = list(necklace)
+        self.n = n
+        self.k = k
+        self._necklaceMasks = necklaceToMasks(necklace)
+        #shiftedNecklace[i-1] is I_i sorted in the <_i order, with the
+        #elements relabeled so that i is 0.
+        self._shiftedNecklace = [sorted((e - i) % n for e in necklace[i-1]) for i in range(1, n+1)]
+        self._size = None
+
+    # containsMask:
+    # Purpose: check whether a bitmask is a basis, i.e. it is a k-subset
+    #          that is >= I_i in the Gale order <_i for every i.
+    def containsMask(self, mask):
+        n = self.n
+        if mask.bit_count() != self.k or not mask >> n == 0:
+            return False
+        elements = maskElements(mask)
+        cut = 0
+        for i in range(1, n+1):
+            #the elements >= i come first in <_i, then the ones < i.
+            while cut < len(elements) and elements[cut] < i:
+                cut += 1
+            shifted = elements[cut:] + elements[:cut]
+            for b, a in zip(shifted, self._shiftedNecklace[i-1]):
+                if (b - i) % n < a:
+                    return False
+        return True
+
+    def __contains__(self, basis):
+        if any(not isinstance(elem, int) or elem < 1 for elem in basis):
+            return False
+        return self.containsMask(setToMask(basis))
 
+    # iterMasks:
+    # Purpose: generate the bases as bitmasks
+    def iterMasks(self):
+        return positroidBasisMasks(self._necklaceMasks, self.n, self.k)
+
+    def __iter__(self):
+        for mask in self.iterMasks():
+            yield maskToSet(mask)
+
+    def __len__(self):
+        if self._size is None:
+            self._size = sum(1 for mask in self.iterMasks())
+        return self._size
+
+    # bases:
+    # Purpose: materialize the bases set, as grassmannNecklaceToPositroid
+    def bases(self):
+        return set(self)
+
+    # key:
+    # Purpose: the necklace as a NecklaceKey
+    def key(self):
+        return NecklaceKey(self._necklaceMasks)
+
+    def __repr__(self):
+        return f'ImplicitPositroid({self.necklace})'
 
 # isPositroid:
 # Purpose: Given the bases set of a matroid determine if it is a positroid
@@ -260,22 +750,65 @@ def grassmannNecklaceToPositroid(necklace):
 #          is itself.
 # matroid: (set of frozen sets) the basis set of a matroid
 # n: the size of the ground set
-def isPositroid(matroid,n):
-    if not isMatroidBases(matroid):
+# validate: (optional) the validation level, see resolveValidation. The
+#   matroid is checked once here, the necklace built from it is trusted.
+def isPositroid(matroid,n,validate = None):
+    level = resolveValidation(validate)
+    if level == VALIDATE_FULL and not isMatroidBases(matroid):
         raise ValueError(f"{matroid} is the not the bases set of a matroid")
-    if any(not rangeCheck(element, n) for element in matroid):
-        raise ValueError(f"The matroid has a basis set that is not in [{n}]")
-    #Since we've checked that matroid is actually the bases set of a matroid,
-    #we can read off the rank
-    k = len(list(matroid)[0])
-    necklace = basesToGrassmannNecklace(matroid,n)
-    if matroid == grassmannNecklaceToPositroid(necklace):
-        return True
-    return False
-
-
-
-
+    checkBases(matroid, n, VALIDATE_SHAPE if level == VALIDATE_FULL else level)
+    for verdict, witness in isPositroidBatch([matroid], n, validate = VALIDATE_TRUSTED):
+        return verdict
+
+# POSITROID_BATCH_CACHE_SIZE: the number of positroids whose bases
+#   isPositroidBatch keeps, so a necklace seen again costs no search
+POSITROID_BATCH_CACHE_SIZE = 1 << 12
+
+# isPositroidBatch:
+# Purpose: isPositroid for a stream of matroids on the same [n] and rank k.
+#          The necklaces come from basesToNecklaceMasks, so dense families
+#          share one GaleRankTable of (n, k). The positroid of the necklace of a
+#          matroid always contains the matroid, so the matroid is a
+#          positroid exactly when they have the same number of bases, and
+#          otherwise the first basis of the positroid that is not in the
+#          matroid is a witness. The bases of the positroids of the first
+#          POSITROID_BATCH_CACHE_SIZE necklaces are kept, since many
+#          matroids share a necklace; after that they are generated
+#          (positroidBasisMasks) only until a witness is found.
+# matroids: an iterable of bases sets (of frozen sets or of bitmasks)
+# n: the size of the ground set
+# k: (optional) the rank, by default the size of the first basis
+# validate: (optional) the validation level, see resolveValidation
+# returns: generator of (verdict, witness) pairs in the order of matroids,
+#          witness is None for a positroid, and otherwise a basis of the
+#          positroid of its necklace (a frozen set) that it is missing
+def isPositroidBatch(matroids, n, k = None, validate = None):
+    level = resolveValidation(validate)
+    positroids = {}
+    for matroid in matroids:
+        if level != VALIDATE_TRUSTED:
+            checkBases({basis if not isinstance(basis, int) else maskToSet(basis) for basis in matroid}, n, level)
+        baseMasks = {basis if isinstance(basis, int) else setToMask(basis) for basis in matroid}
+        if len(baseMasks) == 0:
+            raise ValueError(EMPTY_BASES_MESSAGE)
+        if k is None:
+            k = maskSize(next(iter(baseMasks)))
+        if any(maskSize(mask) != k or mask >> n for mask in baseMasks):
+            raise ValueError(f'the bases of {matroid} are not all {k}-subsets of [{n}]')
+        necklaceMasks = tuple(basesToNecklaceMasks(baseMasks, n, k))
+        positroid = positroids.get(necklaceMasks)
+        if positroid is None and len(positroids) < POSITROID_BATCH_CACHE_SIZE:
+            positroid = tuple(positroidBasisMasks(necklaceMasks, n, k))
+            positroids[necklaceMasks] = positroid
+        if positroid is not None and len(positroid) == len(baseMasks):
+            yield (True, None)
+            continue
+        witness = None
+        for mask in positroid or positroidBasisMasks(necklaceMasks, n, k):
+            if mask not in baseMasks:
+                witness = maskToSet(mask)
+                break
+        yield (witness is None, witness)
 
 # printGrassmannNecklace:
 # Purpose: Given a Grassmann Necklace print in out.
@@ -327,8 +860,22 @@ def plussCoordinates(first, other):
 # corresponding to the smallest positroid containing it.
 # matroid: circuit set of a matroid
 # n: (int) the size of the ground set
-def circuitToLeCoords(matroid, n):
-    GN = circuitToGrassmannNecklace(matroid, n)
+# validate: (optional) the validation level, see resolveValidation
+def circuitToLeCoords(matroid, n, validate = None):
+    GN = circuitToGrassmannNecklace(matroid, n, validate)
+    return(necklaceToLeCoords(GN))
+
+# oracleToLeCoords:
+# Purpose: Given a matroid as a MatroidOracle, give the coordinates in the Le
+# diagram corresponding to the smallest positroid containing it.
+# oracle: a MatroidOracle
+def oracleToLeCoords(oracle):
+    return(necklaceToLeCoords(oracleToGrassmannNecklace(oracle)))
+
+# necklaceToLeCoords:
+# Purpose: Given a Grassmann necklace, give the coordinates of the +'s in its Le diagram
+# GN: (list of frozen sets) a Grassmann necklace
+def necklaceToLeCoords(GN):
     plusses = {coord for elem in GN for coord in plussCoordinates(GN[0], elem) }
     return(plusses)
 
@@ -336,12 +883,122 @@ def circuitToLeCoords(matroid, n):
 # Purpose: Given the circuit set of a matroid, give the dimension of the smallest positroid containing it.
 # matroid: circuit set of a matroid
 # n: (int) the size of the ground set
-def circuitToDimension(matroid, n):
-    return(len(circuitToCoords(matroid, n)))
+# validate: (optional) the validation level, see resolveValidation
+def circuitToDimension(matroid, n, validate = None):
+    return(positroidEnvelopeDimension(matroid, n, 'circuits', validate))
+
+# oracleToDimension:
+# Purpose: Given a matroid as a MatroidOracle, give the dimension of the smallest positroid containing it.
+# oracle: a MatroidOracle
+def oracleToDimension(oracle):
+    return(positroidEnvelopeDimension(oracle))
+
+# basesToDimension:
+# Purpose: Given the bases set of a matroid, give the dimension of the smallest positroid containing it.
+# matroid: bases set of a matroid
+# n: (int) the size of the ground set
+# validate: (optional) the validation level, see resolveValidation
+def basesToDimension(matroid, n, validate = None):
+    return(positroidEnvelopeDimension(matroid, n, 'bases', validate))
+
+# circuitMasksToNecklaceMasks:
+# Purpose: The Grassmann necklace of a matroid given by circuit bitmasks,
+#          as bitmasks. A set is independent if it contains no circuit,
+#          which is one SetTrie.hasSubsetOf query. The first element is
+#          built greedily in the <1 order. After that I_(i+1) contains I_i
+#          minus i, so only the one element replacing i has to be found,
+#          the first one in the <i+1 order that keeps the set independent.
+# circuitMasks: a SetTrie of the circuits, or an iterable of their bitmasks
+# n: (int) the size of the ground set
+# shiftedOrders: (optional) the list of shiftedRange(n, i) for i in [n],
+#          so callers can share it
+def circuitMasksToNecklaceMasks(circuitMasks, n, shiftedOrders = None):
+    if shiftedOrders is None:
+        shiftedOrders = [shiftedRange(n, i) for i in range(1, n+1)]
+    circuitTrie = circuitMasks if isinstance(circuitMasks, SetTrie) else SetTrie(circuitMasks)
+    def isIndependent(candidate):
+        return not circuitTrie.hasSubsetOf(candidate)
+    if n == 0:
+        return []
+    current = 0
+    for v in shiftedOrders[0]:
+        if isIndependent(current | elementMask(v)):
+            current |= elementMask(v)
+    necklaceMasks = [current]
+    for i in range(1, n):
+        if current >> (i-1) & 1:
+            current &= ~elementMask(i)
+            for v in shiftedOrders[i]:
+                if not current >> (v-1) & 1 and isIndependent(current | elementMask(v)):
+                    current |= elementMask(v)
+                    break
+        necklaceMasks.append(current)
+    return necklaceMasks
+
+# positroidEnvelopeDimension:
+# Purpose: The dimension of the smallest positroid containing a matroid,
+#          i.e. of the positroid cell of its Grassmann necklace.
+# matroid: a MatroidOracle, or a set of frozen sets (or of bitmasks)
+# n: (int) the size of the ground set, not needed for an oracle
+# given: 'circuits' or 'bases', what the sets of matroid are
+# validate: (optional) the validation level (see resolveValidation) for
+#          the check that matroid is a circuit (bases) set over [n]. Use
+#          VALIDATE_TRUSTED for families known to be valid, such as the
+#          output of matroidClosure.
+def positroidEnvelopeDimension(matroid, n = None, given = 'circuits', validate = None):
+    return positroidEnvelopeDimensions([matroid], n, given, validate)[0]
+
+# positroidEnvelopeDimensions:
+# Purpose: positroidEnvelopeDimension for many matroids over the same [n].
+#          The shifted orders are built once for the whole batch, each
+#          circuit family is indexed once in a SetTrie (shared by its
+#          validation and its necklace), and a family that appears more
+#          than once is validated and computed only once. Every distinct
+#          family is checked at the validation level; pass VALIDATE_SHAPE
+#          or VALIDATE_TRUSTED to skip the axiom checks for families known
+#          to be matroids.
+# matroids: an iterable of matroids, all given the same way
+# returns: list of ints, in the order of matroids
+def positroidEnvelopeDimensions(matroids, n = None, given = 'circuits', validate = None):
+    if given not in ('circuits', 'bases'):
+        raise ValueError(f"given must be 'circuits' or 'bases', not {given}")
+    level = resolveValidation(validate)
+    shiftedOrders = None
+    known = {}
+    dimensions = []
+    for matroid in matroids:
+        if isinstance(matroid, MatroidOracle):
+            necklaceMasks = necklaceToMasks(oracleToGrassmannNecklace(matroid))
+            dimensions.append(necklaceToDecoratedPermutation(necklaceMasks, VALIDATE_TRUSTED).dimension())
+            continue
+        if n is None:
+            raise ValueError('n is needed unless the matroid is a MatroidOracle')
+        masks = frozenset(member if isinstance(member, int) else setToMask(member) for member in matroid)
+        if masks not in known:
+            if given == 'circuits':
+                circuitTrie = SetTrie(masks)
+                if level == VALIDATE_FULL:
+                    checkCircuits(masksToFamily(masks), n, level, circuitTrie)
+                elif level == VALIDATE_SHAPE and any(mask == 0 or mask >> n for mask in masks):
+                    raise ValueError("some circuit set is empty or not in range")
+                if shiftedOrders is None:
+                    shiftedOrders = [shiftedRange(n, i) for i in range(1, n+1)]
+                necklaceMasks = circuitMasksToNecklaceMasks(circuitTrie, n, shiftedOrders)
+            elif len(masks) == 0:
+                raise ValueError(EMPTY_BASES_MESSAGE)
+            else:
+                k = maskSize(next(iter(masks)))
+                if level == VALIDATE_FULL:
+                    checkBases(masksToFamily(masks), n, level)
+                elif level == VALIDATE_SHAPE and any(maskSize(mask) != k or mask >> n for mask in masks):
+                    raise ValueError("the bases are not all the same size in range")
+                necklaceMasks = basesToNecklaceMasks(masks, n, k)
+            known[masks] = necklaceToDecoratedPermutation(necklaceMasks, VALIDATE_TRUSTED).dimension()
+        dimensions.append(known[masks])
+    return dimensions
 
 
 
-'''
 ####################################################
 #Le Diagrams
 ####################################################
@@ -377,7 +1034,7 @@ def verifyLeDiagram(leDiagram):
     #Verify tha the Young Tableau is in fact a Young Tableau
     else:
         partLength = [len(part) for part in filledYoungTab]
-        if (not all(x<y for x,y in zip(partLength,parthLength[1:]))):
+        if (not all(x>=y for x,y in zip(partLength,partLength[1:]))):
             print("ERROR: Young Tableau must have non-increasing part lengths.")
         #Verify that the Young Tableau satisfies the + property.
         elif (not plusProperty(filledYoungTab)):
@@ -570,6 +1227,173 @@ def nextLeDiagam(leDiagram,n,k):
                 #If both shape and fill are maxed, we are done.
                 return None
             
+# LeDiagramView:
+# Purpose: An immutable view of a Le diagram, as produced by
+#   iterLeDiagramViews. Each row is stored as a bitmask (bit j is the
+#   cell in column j, 1 for a +), and the rows above the last one are a
+#   tuple shared with every other diagram that has the same upper rows,
+#   so making a view does not copy the diagram.
+#   n,k: the Le diagram is in a k*(n-k) box
+#   shape: tuple of the k part lengths (padded with 0's)
+class LeDiagramView:
+    __slots__ = ("n", "k", "shape", "_upperRows", "_lastRow")
+
+    def __init__(self, n, k, shape, upperRows, lastRow):
+        object.__setattr__(self, "n", n)
+        object.__setattr__(self, "k", k)
+        object.__setattr__(self, "shape", tuple(shape))
+        object.__setattr__(self, "_upperRows", tuple(upperRows))
+        object.__setattr__(self, "_lastRow", lastRow)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('LeDiagramView is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('LeDiagramView is immutable')
+
+    def __reduce__(self):
+        return (LeDiagramView, (self.n, self.k, self.shape, self._upperRows, self._lastRow))
+
+    # rowMasks:
+    # Purpose: the rows of the nonzero parts as a tuple of bitmasks
+    def rowMasks(self):
+        if self._lastRow is None:
+            return self._upperRows
+        return self._upperRows + (self._lastRow,)
+
+    # filledYoungTab:
+    # Purpose: the diagram in the list of lists form used by nextLeDiagam
+    def filledYoungTab(self):
+        rows = self.rowMasks()
+        filledYoungTab = []
+        for i in range(self.k):
+            if i < len(rows):
+                filledYoungTab.append([(rows[i] >> j) & 1 for j in range(self.shape[i])])
+            else:
+                filledYoungTab.append([])
+        return filledYoungTab
+
+    # leDiagram:
+    # Purpose: the Le diagram tuple (n,k,filledYoungTab)
+    def leDiagram(self):
+        return (self.n, self.k, self.filledYoungTab())
+
+    # dimension:
+    # Purpose: the number of +'s
+    def dimension(self):
+        return sum(row.bit_count() for row in self.rowMasks())
+
+    def __repr__(self):
+        return f'LeDiagramView({self.leDiagram()})'
+
+#plusRowFillings:
+#Purpose: Generate every row of length partLength, as a bitmask, that
+#   keeps the + property below rows whose +'s are in the columns of
+#   topPlusMask. A row is either all 0's, or has its first + in some
+#   column f, is 0 before f, is + after f in every column of the mask,
+#   and is free elsewhere. For a fixed f the free cells are run through
+#   in Gray code order, so consecutive rows differ in a single cell.
+#topPlusMask: (int) the columns with a + above the row
+#partLength: (int) the length of the row
+def plusRowFillings(topPlusMask, partLength):
+    yield 0
+    full = (1 << partLength) - 1
+    for f in range(partLength):
+        after = full & ~((2 << f) - 1)
+        row = (1 << f) | (topPlusMask & after)
+        freeBits = [1 << (e - 1) for e in maskElements(after & ~topPlusMask)]
+        yield row
+        for count in range(1, 1 << len(freeBits)):
+            row ^= freeBits[(count & -count).bit_length() - 1]
+            yield row
+
+#_plusRowFillingsFrom: (helper function to iterLeDiagramViewsOfShape)
+#Purpose: the rows of plusRowFillings from startRow on
+def _plusRowFillingsFrom(topPlusMask, partLength, startRow):
+    fillings = plusRowFillings(topPlusMask, partLength)
+    for row in fillings:
+        if row == startRow:
+            yield row
+            yield from fillings
+            return
+    raise ValueError(f'{startRow} is not a filling of a row of length {partLength} below {topPlusMask}')
+
+#iterLeDiagramViews:
+#Purpose: Iterate though all Le Diagrams in a k*(n-k) box, as
+#   LeDiagramViews. Shapes come in the order of nextYoungDiagram, and
+#   each shape is run through by iterLeDiagramViewsOfShape.
+#n,k: non-negative integers, 0 <= k <= n
+def iterLeDiagramViews(n,k):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    if ((n==0) or (k==0) or (n==k)):
+        yield LeDiagramView(n,k,tuple(0 for i in range(k)),(),None)
+        return
+    currentShape = nextYoungDiagram(k,n-k,None)
+    while currentShape is not None:
+        yield from iterLeDiagramViewsOfShape(n,k,currentShape)
+        currentShape = nextYoungDiagram(k,n-k,currentShape)
+
+#iterLeDiagramViewsOfShape:
+#Purpose: Iterate though all Le Diagrams of one shape, as LeDiagramViews,
+#   optionally with the top rows fixed. The rows are filled top to
+#   bottom with a stack of row generators, keeping the mask of columns
+#   holding a + above each row, so the + property is never rechecked.
+#   All but the last row only change when the last row has run out, so
+#   each diagram costs O(1) amortized time, and consecutive diagrams
+#   mostly differ in one cell.
+#n,k: non-negative integers, 0 <= k <= n
+#shape: list of k part lengths as from nextYoungDiagram
+#prefixRows: (optional) tuple of bitmasks, the fillings of the top rows,
+#   which must satisfy the + property
+#startRows: (optional) the fillings of the rows below prefixRows of the
+#   diagram to start from (as from unrankLeDiagram), to carry on an
+#   enumeration part way through the shape
+def iterLeDiagramViewsOfShape(n,k,shape,prefixRows = (),startRows = None):
+    shape = tuple(shape)
+    partLengths = [part for part in shape if part != 0]
+    if len(prefixRows) > len(partLengths):
+        raise ValueError(f'{prefixRows} has more rows than the shape {shape}')
+    if len(prefixRows) == len(partLengths):
+        yield LeDiagramView(n,k,shape,tuple(prefixRows),None)
+        return
+    if startRows is not None and len(prefixRows) + len(startRows) != len(partLengths):
+        raise ValueError(f'{startRows} does not fill the rows of {shape} below {prefixRows}')
+    lastDepth = len(partLengths) - 1
+    startMask = 0
+    for row in prefixRows:
+        startMask |= row
+    #while resuming, each new row generator starts at the row of startRows
+    resuming = startRows is not None
+    def rowFillings(topPlusMask, depth):
+        if resuming:
+            return _plusRowFillingsFrom(topPlusMask, partLengths[depth], startRows[depth-len(prefixRows)])
+        return plusRowFillings(topPlusMask, partLengths[depth])
+    rowGenerators = [rowFillings(startMask, len(prefixRows))]
+    masks = [startMask]
+    prefixes = [tuple(prefixRows)]
+    while rowGenerators:
+        depth = len(prefixRows) + len(rowGenerators) - 1
+        if depth == lastDepth:
+            upperRows = prefixes[-1]
+            for row in rowGenerators[-1]:
+                yield LeDiagramView(n,k,shape,upperRows,row)
+            rowGenerators.pop()
+            masks.pop()
+            prefixes.pop()
+            resuming = False
+            continue
+        row = next(rowGenerators[-1], None)
+        if row is None:
+            rowGenerators.pop()
+            masks.pop()
+            prefixes.pop()
+            continue
+        newMask = masks[-1] | row
+        rowGenerators.append(rowFillings(newMask, depth+1))
+        masks.append(newMask)
+        prefixes.append(prefixes[-1] + (row,))
+
 # leDiagramASCII:
 # Purpose: Print out a Le Diagram in ASCII
 # leDiagram: a Le Diagram (n,k,filledYoungTab) or a filledYoungTab.
@@ -615,11 +1439,11 @@ def leDiagramTex(leDiagram):
     partLength += [0 for i in range(k-numParts+1)]
     print("\\begin{center}")
     print("\t\\begin{tikzpicture}[scale=1]")
-    print("\t\t\draw[dashed] (0,0) rectangle (" + str(int(n-k)) + "," + str(int(k)) + ");\n")
+    print("\t\t\\draw[dashed] (0,0) rectangle (" + str(int(n-k)) + "," + str(int(k)) + ");\n")
     
     for i in range(numParts):
         if (len(filledYoungTab[i]) != 0):
-            print("\t\t\draw[very thick] (0," + str(k-i-1) + ") grid ++(" + str(int(len(filledYoungTab[i]))) + ",1);")
+            print("\t\t\\draw[very thick] (0," + str(k-i-1) + ") grid ++(" + str(int(len(filledYoungTab[i]))) + ",1);")
 
     print("")
 
@@ -648,6 +1472,487 @@ def leDiagramTex(leDiagram):
     print("\t\\end{tikzpicture}")
     print("\\end{center}")
 
+####################################################
+#Counting Le Diagrams
+####################################################
+#The counts below never list the diagrams. A Le diagram is built row by
+#row from the bottom (shortest) row up. Call a column available if a +
+#may still be put above it, i.e. no 0 in it has a + to its left.
+#Widening the diagram by one column adds an available column. A new row
+#over a available columns is either all 0's (a stays the same), or it is
+#0 on r available columns, then a +, then s more +'s among the a-r-1
+#available columns after it. The columns after the first + that get a 0
+#stop being available, so a becomes r+1+s. The number of ways to finish
+#depends only on a, so the state of the dynamic program is the number
+#of available columns. The shapes are the lattice paths from the bottom
+#left to the top right of the k*(n-k) box. Rows are vertical steps and
+#new columns are horizontal steps, so summing over paths counts every
+#shape at once.
+#Counts by dimension are polynomials in q (one power of q per +). They
+#are packed into one big integer with a block of bits per power of q,
+#so multiplying by q is a shift, and the counts stay exact.
+
+#_leRowTransitions: (helper function to the Le diagram counts)
+#Purpose: the weights of filling a row over a available columns so that
+#   a2 columns stay available, as (shift, multiplicity) pairs, where the
+#   shift is blockBits times the number of +'s in the row.
+#width: (int) the largest number of available columns, n-k
+#blockBits: (int) bits per power of q, 0 to count without dimensions
+#returns: list T with T[a][a2] a list of (shift, multiplicity) pairs
+def _leRowTransitions(width, blockBits):
+    transitions = []
+    for a in range(width+1):
+        row = []
+        for a2 in range(a+1):
+            terms = []
+            if a2 == a:
+                terms.append((0,1))
+            if blockBits == 0:
+                #sum over t of comb(a-a2+t-1, t-1) is comb(a, a2-1)
+                if a2 >= 1:
+                    terms = [(0, (1 if a2 == a else 0) + math.comb(a,a2-1))]
+            else:
+                #t is the number of +'s, the first + is after a2-t zeros
+                for t in range(1,a2+1):
+                    terms.append((blockBits*t, math.comb(a-a2+t-1,t-1)))
+            row.append(terms)
+        transitions.append(row)
+    return transitions
+
+#_fillLeRow: (helper function to the Le diagram counts)
+#Purpose: apply one row of the dynamic program to the counts by number
+#   of available columns.
+#values: list, values[a] the (packed) count with a available columns
+#transitions: the output of _leRowTransitions
+#returns: list of the same length as values
+def _fillLeRow(values, transitions):
+    newValues = [0]*len(values)
+    for a in range(len(values)):
+        value = values[a]
+        if not value:
+            continue
+        for a2 in range(a+1):
+            for shift, multiplicity in transitions[a][a2]:
+                newValues[a2] += (value*multiplicity) << shift
+    return newValues
+
+#_unpackDimensions: (helper function to the Le diagram counts)
+#Purpose: split a packed polynomial into its list of coefficients
+def _unpackDimensions(packed, blockBits, maxDimension):
+    blockMask = (1 << blockBits) - 1
+    return [(packed >> (blockBits*d)) & blockMask for d in range(maxDimension+1)]
+
+#_leDiagramCounts: (helper function to the Le diagram counts)
+#Purpose: the (packed) number of Le diagrams in a k*(n-k) box, summed
+#   over every shape, or of one shape.
+#n,k: non-negative integers, 0 <= k <= n
+#byDimension: (bool) count by number of +'s
+#shape: (optional) the list of part lengths, top part first
+def _leDiagramCounts(n, k, byDimension, shape = None):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    width = n-k
+    #every coefficient counts fillings of at most k*(n-k) cells
+    blockBits = k*width+1 if byDimension else 0
+    transitions = _leRowTransitions(width, blockBits)
+    if shape is not None:
+        parts = list(shape) + [0]*(k-len(shape))
+        if len(parts) != k or any(part > width or part < 0 for part in parts) or \
+           any(parts[i] < parts[i+1] for i in range(k-1)):
+            raise ValueError(f'{shape} is not a Young diagram in a {k}*{width} box')
+        values = [0]*(width+1)
+        values[0] = 1
+        previousLength = 0
+        for partLength in reversed(parts):
+            #widen to the new row length, then fill the row
+            step = partLength - previousLength
+            values = [0]*step + values[:len(values)-step]
+            values = _fillLeRow(values, transitions)
+            previousLength = partLength
+        return sum(values), blockBits
+    #values[c][a]: c columns added so far, a of them available
+    values = [[0]*(width+1) for c in range(width+1)]
+    values[0][0] = 1
+    for r in range(k+1):
+        for c in range(width):
+            for a in range(c+1):
+                if values[c][a]:
+                    values[c+1][a+1] += values[c][a]
+        if r == k:
+            break
+        values = [_fillLeRow(values[c], transitions) for c in range(width+1)]
+    return sum(values[width]), blockBits
+
+#countLeDiagrams:
+#Purpose: the number of Le diagrams in a k*(n-k) box, i.e. the number of
+#   positroids (positroid cells) of [n] of rank k, without listing them.
+#n,k: non-negative integers, 0 <= k <= n
+def countLeDiagrams(n, k):
+    return _leDiagramCounts(n, k, False)[0]
+
+#countLeDiagramsByDimension:
+#Purpose: the number of Le diagrams in a k*(n-k) box with each number of
+#   +'s, i.e. positroid cells of [n] of rank k by dimension.
+#n,k: non-negative integers, 0 <= k <= n
+#returns: list of ints, entry d is the number with d +'s
+def countLeDiagramsByDimension(n, k):
+    packed, blockBits = _leDiagramCounts(n, k, True)
+    return _unpackDimensions(packed, blockBits, k*(n-k))
+
+#countLeDiagramsOfShape:
+#Purpose: the number of Le diagrams of a given shape, in total or by
+#   number of +'s
+#n,k: non-negative integers, 0 <= k <= n
+#shape: list of part lengths as from nextYoungDiagram
+#byDimension: (bool) if true return the list of counts by number of +'s
+def countLeDiagramsOfShape(n, k, shape, byDimension = False):
+    packed, blockBits = _leDiagramCounts(n, k, byDimension, shape)
+    if not byDimension:
+        return packed
+    return _unpackDimensions(packed, blockBits, sum(shape))
+
+#countLeDiagramsByShape:
+#Purpose: the number of Le diagrams of every shape in a k*(n-k) box.
+#   There are comb(n,k) shapes, each counted in O(k(n-k)^2) time.
+#n,k: non-negative integers, 0 <= k <= n
+#byDimension: (bool) count each shape by number of +'s
+#returns: dict from shape tuples (as from nextYoungDiagram) to counts
+def countLeDiagramsByShape(n, k, byDimension = False):
+    counts = {}
+    currentShape = nextYoungDiagram(k,n-k,None)
+    while currentShape is not None:
+        counts[tuple(currentShape)] = countLeDiagramsOfShape(n, k, currentShape, byDimension)
+        currentShape = nextYoungDiagram(k,n-k,currentShape)
+    return counts
+
+####################################################
+#Sampling Le Diagrams
+####################################################
+#Uniform samples come from the same dynamic program as the counts, run
+#backwards: for every state (r rows and c columns placed, a columns
+#available) we count the ways to finish the diagram, then walk from the
+#empty diagram choosing each step with probability proportional to the
+#number of diagrams that step leads to.
+
+# LE_SAMPLING_CACHE_SIZE: the number of completion tables kept
+LE_SAMPLING_CACHE_SIZE = 8
+
+#_leCompletionTable: (helper function to sampleLeDiagrams)
+#Purpose: the (packed) number of ways to finish a Le diagram from every
+#   state of the dynamic program, for every shape or for one shape.
+#n,k: non-negative integers, 0 <= k <= n
+#byDimension: (bool) pack the counts by number of +'s
+#shape: None, or a tuple of part lengths (top part first)
+#returns: (completions, blockBits, rowLengths) where completions[r][c][a]
+#   is the packed count and rowLengths lists the lengths of the rows
+#   from the bottom up (None when every shape is allowed)
+@functools.lru_cache(maxsize=LE_SAMPLING_CACHE_SIZE)
+def _leCompletionTable(n, k, byDimension, shape):
+    width = n-k
+    blockBits = k*width+1 if byDimension else 0
+    transitions = _leRowTransitions(width, blockBits)
+    rowLengths = None if shape is None else list(reversed(shape))
+    completions = [[[0]*(width+1) for c in range(width+1)] for r in range(k+1)]
+    for r in reversed(range(k+1)):
+        for c in reversed(range(width+1)):
+            for a in range(c+1):
+                total = 0
+                if _leCanWiden(r, c, k, width, rowLengths):
+                    total += completions[r][c+1][a+1]
+                if _leCanFill(r, c, k, rowLengths):
+                    for a2 in range(a+1):
+                        for shift, multiplicity in transitions[a][a2]:
+                            total += (completions[r+1][c][a2]*multiplicity) << shift
+                if r == k and c == width:
+                    total = 1
+                completions[r][c][a] = total
+    return completions, blockBits, rowLengths
+
+#_leCanWiden, _leCanFill: (helper functions to sampleLeDiagrams)
+#Purpose: whether a column may be added (resp. a row filled) when r rows
+#   and c columns have been placed, for the shape given by rowLengths.
+def _leCanWiden(r, c, k, width, rowLengths):
+    if c >= width:
+        return False
+    return rowLengths is None or r == k or c < rowLengths[r]
+
+def _leCanFill(r, c, k, rowLengths):
+    if r >= k:
+        return False
+    return rowLengths is None or c == rowLengths[r]
+
+#_leWeight: (helper function to sampleLeDiagrams)
+#Purpose: the number of diagrams an unpacked count holds (dimension is
+#   None), or the number with the given number of +'s in a packed count
+def _leWeight(packed, blockBits, dimension):
+    if dimension is None:
+        return packed
+    if dimension < 0:
+        return 0
+    return (packed >> (blockBits*dimension)) & ((1 << blockBits) - 1)
+
+#_sampleOneLeDiagram: (helper function to sampleLeDiagrams)
+#Purpose: draw one Le diagram uniformly, as a list of (length, row
+#   bitmask) pairs from the bottom row up (rows of length 0 included)
+def _sampleOneLeDiagram(n, k, table, dimension, rng):
+    completions, blockBits, rowLengths = table
+    width = n-k
+    r = 0
+    c = 0
+    available = []
+    rows = []
+    remaining = dimension
+    while r < k or c < width:
+        a = len(available)
+        #each option is (weight, next a, number of +'s in the row), with
+        #next a = None for adding a column
+        options = []
+        if _leCanWiden(r, c, k, width, rowLengths):
+            options.append((_leWeight(completions[r][c+1][a+1], blockBits, remaining), None, 0))
+        if _leCanFill(r, c, k, rowLengths):
+            nextCompletions = completions[r+1][c]
+            options.append((_leWeight(nextCompletions[a], blockBits, remaining), a, 0))
+            for a2 in range(1, a+1):
+                for t in range(1, a2+1):
+                    weight = math.comb(a-a2+t-1, t-1)*_leWeight(nextCompletions[a2], blockBits,
+                                                                None if remaining is None else remaining-t)
+                    options.append((weight, a2, t))
+        pick = rng.randrange(sum(option[0] for option in options))
+        for weight, a2, t in options:
+            if pick < weight:
+                break
+            pick -= weight
+        if a2 is None:
+            available.append(c)
+            c += 1
+            continue
+        row = 0
+        if t > 0:
+            #the first + is the (a2-t+1)th available column, the other
+            #t-1 +'s are spread uniformly over the available columns after it
+            first = a2 - t
+            extra = sorted(rng.sample(available[first+1:], t-1))
+            for column in [available[first]] + extra:
+                row |= 1 << column
+            available = available[:first+1] + extra
+            if remaining is not None:
+                remaining -= t
+        rows.append((c, row))
+        r += 1
+    return rows
+
+#sampleLeDiagrams:
+#Purpose: Draw Le diagrams in a k*(n-k) box uniformly at random, so also
+#   positroids of [n] of rank k. The draw can be restricted to one
+#   dimension (number of +'s) and/or one shape, and is then uniform
+#   among those diagrams. The completion table is built once per
+#   (n, k, dimension?, shape) and cached, after which each sample takes
+#   O(n + k(n-k)^2) steps.
+#n,k: non-negative integers, 0 <= k <= n
+#count: (int) the number of samples
+#seed: (optional) seed for a new random.Random
+#dimension: (optional int) only draw diagrams with this many +'s
+#shape: (optional) only draw diagrams of this shape (list of part lengths)
+#rng: (optional) a random.Random to draw from, instead of seed
+#returns: list of LeDiagramViews
+def sampleLeDiagrams(n, k, count, seed = None, dimension = None, shape = None, rng = None):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    if rng is None:
+        rng = random.Random(seed)
+    if shape is not None:
+        shape = tuple(shape) + (0,)*(k-len(shape))
+        countLeDiagramsOfShape(n, k, shape)    #checks the shape
+    table = _leCompletionTable(n, k, dimension is not None, shape)
+    if _leWeight(table[0][0][0][0], table[1], dimension) == 0:
+        raise ValueError(f'there is no Le diagram of dimension {dimension} to sample')
+    samples = []
+    for i in range(count):
+        rows = _sampleOneLeDiagram(n, k, table, dimension, rng)
+        rows.reverse()
+        sampleShape = tuple(length for length, row in rows)
+        rowMasks = tuple(row for length, row in rows if length != 0)
+        samples.append(LeDiagramView(n, k, sampleShape, rowMasks, None))
+    return samples
+
+#samplePositroids:
+#Purpose: Draw positroids of [n] of rank k uniformly at random, as
+#   PositroidRecords, through sampleLeDiagrams.
+#   The arguments are those of sampleLeDiagrams.
+def samplePositroids(n, k, count, seed = None, dimension = None, shape = None, rng = None):
+    records = []
+    for view in sampleLeDiagrams(n, k, count, seed, dimension, shape, rng):
+        leDiagram = view.leDiagram()
+        records.append(PositroidRecord(leDiagram, leDiagramToGrassmannNecklace(leDiagram, VALIDATE_TRUSTED)))
+    return records
+
+####################################################
+#Ranking Le Diagrams
+####################################################
+#The rank of a Le diagram is its position in iterLeDiagramViews. Shapes
+#come in the order of nextYoungDiagram and are counted with
+#countLeDiagramsOfShape. Inside a shape the rows are filled top to bottom,
+#and the number of ways to fill the rows below a row depends only on the
+#columns holding a + above them, so those counts are cached per shape.
+#Since the rank is a single int, it is a small checkpoint: an enumeration
+#can be stopped, saved and carried on from it, and any range [i, j) of
+#diagrams can be run on its own.
+
+# LE_RANKING_CACHE_SIZE: the number of (n, k) shape tables, and of shapes,
+#   whose counts are kept
+LE_RANKING_CACHE_SIZE = 16
+
+#_leShapeOffsets: (helper function to the Le diagram ranks)
+#Purpose: the shapes in a k*(n-k) box in enumeration order, and the
+#   number of Le diagrams before each of them
+#returns: (shapes, offsets) where offsets has one more entry, the total
+@functools.lru_cache(maxsize=LE_RANKING_CACHE_SIZE)
+def _leShapeOffsets(n, k):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    shapes = []
+    offsets = [0]
+    for shape, count in countLeDiagramsByShape(n, k).items():
+        shapes.append(shape)
+        offsets.append(offsets[-1] + count)
+    return shapes, offsets
+
+#_leFillingCounts: (helper function to the Le diagram ranks)
+#Purpose: the cache of _leFillingCount for one shape
+@functools.lru_cache(maxsize=LE_RANKING_CACHE_SIZE)
+def _leFillingCounts(partLengths):
+    return {}
+
+#_leFillingCount: (helper function to the Le diagram ranks)
+#Purpose: the number of ways to fill the rows depth, depth+1, ... of a
+#   shape below the columns of topPlusMask
+#partLengths: tuple of the nonzero part lengths
+def _leFillingCount(partLengths, depth, topPlusMask):
+    if depth == len(partLengths):
+        return 1
+    #the rows below only see the columns of their own length
+    topPlusMask &= (1 << partLengths[depth]) - 1
+    counts = _leFillingCounts(partLengths)
+    key = (depth, topPlusMask)
+    if key not in counts:
+        counts[key] = sum(_leFillingCount(partLengths, depth+1, topPlusMask | row)
+                          for row in plusRowFillings(topPlusMask, partLengths[depth]))
+    return counts[key]
+
+#rankLeDiagram:
+#Purpose: the position of a Le diagram in iterLeDiagramViews
+#leDiagram: a Le Diagram (n,k,filledYoungTab) or a LeDiagramView
+#returns: int, 0 <= rank < countLeDiagrams(n,k)
+def rankLeDiagram(leDiagram):
+    if isinstance(leDiagram, LeDiagramView):
+        n, k, shape, rows = leDiagram.n, leDiagram.k, leDiagram.shape, leDiagram.rowMasks()
+    else:
+        n, k, filledYoungTab = leDiagram
+        shape = tuple(len(part) for part in filledYoungTab) + (0,)*(k-len(filledYoungTab))
+        rows = tuple(sum(cell << j for j, cell in enumerate(part)) for part in filledYoungTab if part)
+    shapes, offsets = _leShapeOffsets(n, k)
+    try:
+        rank = offsets[shapes.index(tuple(shape))]
+    except ValueError:
+        raise ValueError(f'{shape} is not a Young diagram in a {k}*{n-k} box')
+    partLengths = tuple(part for part in shape if part != 0)
+    topPlusMask = 0
+    for depth, row in enumerate(rows):
+        for filling in plusRowFillings(topPlusMask, partLengths[depth]):
+            if filling == row:
+                break
+            rank += _leFillingCount(partLengths, depth+1, topPlusMask | filling)
+        else:
+            raise ValueError(f'{leDiagram} does not satisfy the + property')
+        topPlusMask |= row
+    return rank
+
+#unrankLeDiagram:
+#Purpose: the Le diagram at a given position of iterLeDiagramViews,
+#   without running through the ones before it
+#n,k: non-negative integers, 0 <= k <= n
+#index: (int) 0 <= index < countLeDiagrams(n,k)
+#returns: LeDiagramView
+def unrankLeDiagram(n, k, index):
+    shapes, offsets = _leShapeOffsets(n, k)
+    if index < 0 or index >= offsets[-1]:
+        raise ValueError(f'{index} is not the rank of a Le diagram in a {k}*{n-k} box')
+    shapeIndex = bisect.bisect_right(offsets, index) - 1
+    shape = shapes[shapeIndex]
+    index -= offsets[shapeIndex]
+    partLengths = tuple(part for part in shape if part != 0)
+    topPlusMask = 0
+    rows = []
+    for depth in range(len(partLengths)):
+        for filling in plusRowFillings(topPlusMask, partLengths[depth]):
+            count = _leFillingCount(partLengths, depth+1, topPlusMask | filling)
+            if index < count:
+                break
+            index -= count
+        rows.append(filling)
+        topPlusMask |= filling
+    return LeDiagramView(n, k, shape, tuple(rows), None)
+
+#iterLeDiagramViewsRange:
+#Purpose: Iterate though the Le diagrams of rank start, start+1, ...,
+#   stop-1 in a k*(n-k) box, i.e. the same diagrams as
+#   itertools.islice(iterLeDiagramViews(n,k), start, stop) but without
+#   running through the first start of them.
+#n,k: non-negative integers, 0 <= k <= n
+#start: (int) the rank of the first diagram
+#stop: (optional int) the rank after the last diagram, default all
+def iterLeDiagramViewsRange(n, k, start, stop = None):
+    shapes, offsets = _leShapeOffsets(n, k)
+    if stop is None or stop > offsets[-1]:
+        stop = offsets[-1]
+    if start >= stop:
+        return
+    first = unrankLeDiagram(n, k, start)
+    shapeIndex = shapes.index(first.shape)
+    views = itertools.chain(iterLeDiagramViewsOfShape(n, k, first.shape, (), first.rowMasks()),
+                            *(iterLeDiagramViewsOfShape(n, k, shape) for shape in shapes[shapeIndex+1:]))
+    yield from itertools.islice(views, stop - start)
+
+# LeDiagramEnumerator:
+# Purpose: An iterator over the LeDiagramViews of ranks [start, stop)
+#   whose position can be saved. checkpoint() gives a dict of ints (which
+#   can be stored as json), and fromCheckpoint() carries on from it, e.g.
+#   after a run is killed.
+#   n,k: the Le diagrams are in a k*(n-k) box
+#   position: the rank of the next diagram
+#   stop: the rank after the last diagram
+class LeDiagramEnumerator:
+    def __init__(self, n, k, start = 0, stop = None):
+        total = countLeDiagrams(n, k)
+        self.n = n
+        self.k = k
+        self.position = start
+        self.stop = total if stop is None else min(stop, total)
+        self._views = None
+
+    # checkpoint:
+    # Purpose: the state of the enumeration, see fromCheckpoint
+    def checkpoint(self):
+        return {'n': self.n, 'k': self.k, 'position': self.position, 'stop': self.stop}
+
+    # fromCheckpoint:
+    # Purpose: carry on an enumeration from a checkpoint
+    @classmethod
+    def fromCheckpoint(cls, token):
+        return cls(token['n'], token['k'], token['position'], token['stop'])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.position >= self.stop:
+            raise StopIteration
+        if self._views is None:
+            self._views = iterLeDiagramViewsRange(self.n, self.k, self.position, self.stop)
+        view = next(self._views)
+        self.position += 1
+        return view
+
 ####################################################
 #Functors, bijections, etc.
 ####################################################
@@ -756,7 +2061,12 @@ def getLabelNums(n,k,shape):
         currentLabel += 1
     return (rowNums,colNums)
 
-def leDiagramToGrassmannNecklace(leDiagram):
+# leDiagramToGrassmannNecklace:
+# Purpose: the Grassmann necklace of a Le diagram
+# leDiagram: a Le diagram (n,k,filledYoungTab)
+# validate: (optional) the validation level, see resolveValidation
+def leDiagramToGrassmannNecklace(leDiagram, validate = None):
+    checkLeDiagram(leDiagram, resolveValidation(validate))
     n = leDiagram[0]
     k = leDiagram[1]
     # if n is zero return an empty array
@@ -808,7 +2118,11 @@ def leDiagramToGrassmannNecklace(leDiagram):
             currentIndex += 1
         return necklace
 
-def grassmannNecklaceToLeDiagram(n,k,necklace):
+# grassmannNecklaceToLeDiagram:
+# Purpose: the Le diagram of a Grassmann necklace of [n] of rank k
+# validate: (optional) the validation level, see resolveValidation
+def grassmannNecklaceToLeDiagram(n,k,necklace,validate = None):
+    checkNecklace(necklace, n, k, resolveValidation(validate))
     # if n is zero return an empty array
     if n == 0:
         return (n,k,[])
@@ -822,24 +2136,498 @@ def grassmannNecklaceToLeDiagram(n,k,necklace):
         colNums = sorted(list(necklace[0]))
         rowNums = sorted(list(set([(i+1) for i in range(n) ]).difference(necklace[0])))
         rowNums = rowNums[::-1]
-        shape = [0 for i in range(k)]
-        shape[0] = (n-k) - colNums[0] + 1
-        shape[k-1] = n - colNums[k-1]
-        for i in range(1,k-1):
-            shape[i] = shape[i-1] + colNums[i] - colNums[i+1] + 1
+        #the part of row i is the n-k columns less the colNums[i]-1-i
+        #column labels before its own label
+        shape = [(n-k) - colNums[i] + 1 + i for i in range(k)]
         filledYoungTab = [[0 for i in range(part)] for part in shape]
+        #the position of each label, so a cell is found in O(1)
+        rowPosition = {label: i for i, label in enumerate(rowNums)}
+        colPosition = {label: i for i, label in enumerate(colNums)}
         for i in range(1,n):
             colLabels = sorted(list(necklace[0] - necklace[i]))
             rowLabels = sorted(list(necklace[i] - necklace[0]))
             rowLabels = rowLabels[::-1]
             for j in range(len(colLabels)):
-                xCord = rowNums.index(rowLabels[j])
-                yCord = colNums.index(colLabels[j])
+                xCord = rowPosition[rowLabels[j]]
+                yCord = colPosition[colLabels[j]]
                 filledYoungTab[yCord][xCord] = 1
         return (n,k,filledYoungTab)
                     
             
 
+####################################################
+#Decorated permutations
+####################################################
+#A positroid of [n] is also given by a decorated permutation pi: the
+#necklace goes from I_i to I_(i+1) by removing i and adding pi(i). A fixed
+#point is a loop (i is in no I_j it could leave) or a coloop (i is in every
+#I_j). The conversions to and from necklaces take O(n) bit operations,
+#and the ones to and from Le diagrams O(k(n-k) + n).
+
+# DecoratedPermutation:
+# Purpose: A positroid of [n] of rank k as a decorated permutation, n
+#   small ints instead of n frozen sets, so it is cheap to hash and store.
+#   images: tuple of pi(1), ..., pi(n)
+#   loopMask: the bitmask of the fixed points that are loops, the other
+#             fixed points are coloops
+#   n,k: the size of the ground set and the rank
+# It is immutable, since it is hashed as a cache and catalog key.
+class DecoratedPermutation:
+    __slots__ = ("images", "loopMask", "n", "k")
+
+    def __init__(self, images, loopMask = 0):
+        images = tuple(images)
+        n = len(images)
+        if sorted(images) != list(range(1, n+1)):
+            raise ValueError(f'{images} is not a permutation of [{n}]')
+        if any(images[i-1] != i for i in maskElements(loopMask)):
+            raise ValueError(f'the loops {maskToSet(loopMask)} must be fixed points')
+        object.__setattr__(self, "images", images)
+        object.__setattr__(self, "loopMask", loopMask)
+        object.__setattr__(self, "n", n)
+        #k is the number of anti-exceedances and coloops, i.e. |I_1|
+        object.__setattr__(self, "k", (self._firstNecklaceMask()).bit_count())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('DecoratedPermutation is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('DecoratedPermutation is immutable')
+
+    def __reduce__(self):
+        return (DecoratedPermutation, (self.images, self.loopMask))
+
+    # key:
+    # Purpose: the permutation as n bytes, with 0 for a loop
+    def key(self):
+        return bytes(0 if self.loopMask >> (i-1) & 1 else image
+                     for i, image in enumerate(self.images, 1))
+
+    # fromKey:
+    # Purpose: the inverse of key
+    @classmethod
+    def fromKey(cls, key):
+        loopMask = 0
+        images = []
+        for i, image in enumerate(key, 1):
+            if image == 0:
+                loopMask |= elementMask(i)
+                image = i
+            images.append(image)
+        return cls(images, loopMask)
+
+    def __eq__(self, other):
+        if not isinstance(other, DecoratedPermutation):
+            return NotImplemented
+        return self.images == other.images and self.loopMask == other.loopMask
+
+    def __hash__(self):
+        return hash((self.images, self.loopMask))
+
+    def __repr__(self):
+        return f'DecoratedPermutation({self.images}, loops = {sorted(maskToSet(self.loopMask))})'
+
+    # isLoop, isColoop:
+    # Purpose: whether the element i is a loop (resp. coloop)
+    def isLoop(self, i):
+        return self.loopMask >> (i-1) & 1 == 1
+
+    def isColoop(self, i):
+        return self.images[i-1] == i and not self.isLoop(i)
+
+    # boundedAffine:
+    # Purpose: the bounded affine permutation f of pi on [n], i.e. f(i) is
+    #   pi(i) or pi(i)+n, whichever is in [i, i+n], with f(i) = i for a
+    #   loop and f(i) = i+n for a coloop
+    def boundedAffine(self):
+        affine = []
+        for i, image in enumerate(self.images, 1):
+            if image > i or (image == i and self.isLoop(i)):
+                affine.append(image)
+            else:
+                affine.append(image + self.n)
+        return affine
+
+    # alignments:
+    # Purpose: the number of alignments of pi, which is the length of the
+    #   bounded affine permutation f: the pairs i in [n], j > i with
+    #   f(i) > f(j), where f(j+n) = f(j)+n. Only j < i+n can count, so
+    #   this is O(n^2).
+    def alignments(self):
+        n = self.n
+        affine = self.boundedAffine()
+        count = 0
+        for i in range(n):
+            for j in range(i+1, i+n):
+                if affine[i] > affine[j % n] + n*(j // n):
+                    count += 1
+        return count
+
+    # dimension:
+    # Purpose: the dimension of the positroid cell, k(n-k) minus the
+    #   number of alignments
+    def dimension(self):
+        return self.k*(self.n-self.k) - self.alignments()
+
+    def _firstNecklaceMask(self):
+        #j is in I_1 if it is a coloop, or if it leaves (at step j) before
+        #it is added back (at step pi^-1(j))
+        inverse = [0]*self.n
+        for i, image in enumerate(self.images, 1):
+            inverse[image-1] = i
+        first = 0
+        for j in range(1, self.n+1):
+            if (j < inverse[j-1]) or (inverse[j-1] == j and not self.isLoop(j)):
+                first |= elementMask(j)
+        return first
+
+    # necklaceMasks:
+    # Purpose: the Grassmann necklace as a list of bitmasks
+    def necklaceMasks(self):
+        if self.n == 0:
+            return []
+        masks = [self._firstNecklaceMask()]
+        for i in range(1, self.n):
+            mask = masks[-1]
+            if self.images[i-1] != i:
+                mask = (mask & ~elementMask(i)) | elementMask(self.images[i-1])
+            masks.append(mask)
+        return masks
+
+    # necklace:
+    # Purpose: the Grassmann necklace as a list of frozen sets
+    def necklace(self):
+        return masksToNecklace(self.necklaceMasks())
+
+    # leDiagram:
+    # Purpose: the Le diagram (n,k,filledYoungTab), as from
+    #   grassmannNecklaceToLeDiagram but on the necklace bitmasks: for each
+    #   i the elements of I_1 \ I_i (smallest first) and of I_i \ I_1
+    #   (largest first) are paired off, and each pair is a + of the
+    #   diagram. Each I_1 \ I_i has at most min(k, n-k) elements, so this
+    #   is O(k(n-k) + n).
+    def leDiagram(self):
+        n, k = self.n, self.k
+        if k == 0 or n == k:
+            return (n,k,[])
+        masks = self.necklaceMasks()
+        first = masks[0]
+        colNums = maskElements(first)
+        rowNums = maskElements(groundMask(n) & ~first)[::-1]
+        shape = [(n-k) - colNums[i] + 1 + i for i in range(k)]
+        filledYoungTab = [[0 for j in range(part)] for part in shape]
+        rowPosition = {label: j for j, label in enumerate(rowNums)}
+        colPosition = {label: i for i, label in enumerate(colNums)}
+        for mask in masks[1:]:
+            colLabels = maskElements(first & ~mask)
+            rowLabels = maskElements(mask & ~first)[::-1]
+            for colLabel, rowLabel in zip(colLabels, rowLabels):
+                filledYoungTab[colPosition[colLabel]][rowPosition[rowLabel]] = 1
+        return (n,k,filledYoungTab)
+
+#necklaceToDecoratedPermutation:
+#Purpose: the decorated permutation of a Grassmann necklace
+#necklace: list of frozen sets (or of bitmasks), a Grassmann necklace
+#validate: (optional) the validation level, see resolveValidation
+#returns: DecoratedPermutation
+def necklaceToDecoratedPermutation(necklace, validate = None):
+    masks = [element if isinstance(element, int) else setToMask(element) for element in necklace]
+    n = len(masks)
+    level = resolveValidation(validate)
+    if level != VALIDATE_TRUSTED:
+        checkNecklace(masksToNecklace(masks), n, maskSize(masks[0]) if n else 0, level)
+    images = []
+    loopMask = 0
+    for i in range(1, n+1):
+        current = masks[i-1]
+        following = masks[i % n]
+        bit = elementMask(i)
+        if current & bit:
+            #pi(i) is the element added in place of i, or i for a coloop
+            added = following & ~(current & ~bit)
+            images.append(lowestElement(added) if added else i)
+        else:
+            images.append(i)
+            loopMask |= bit
+    return DecoratedPermutation(images, loopMask)
+
+#leDiagramToDecoratedPermutation:
+#Purpose: the decorated permutation of a Le diagram, read off its pipe
+#   dream: a pipe enters each row from the right and each column from the
+#   bottom, goes west or north, turns at every + and goes straight through
+#   every 0. If the pipe that starts at the step labelled i leaves the
+#   diagram at the row or column labelled j, then pi(i) = j. Every cell is
+#   crossed by two pipes, so this is O(k(n-k) + n).
+#leDiagram: a Le diagram (n,k,filledYoungTab)
+#validate: (optional) the validation level, see resolveValidation
+#returns: DecoratedPermutation
+def leDiagramToDecoratedPermutation(leDiagram, validate = None):
+    checkLeDiagram(leDiagram, resolveValidation(validate))
+    n, k, filledYoungTab = leDiagram
+    shape = [len(part) for part in filledYoungTab] + [0]*(k-len(filledYoungTab))
+    (rowNums,colNums) = getLabelNums(n,k,list(shape))
+    images = [0]*n
+    loopMask = 0
+    def exitLabel(row, column, north):
+        while row >= 0 and column >= 0:
+            if column < shape[row] and filledYoungTab[row][column] == 1:
+                north = not north
+            if north:
+                row -= 1
+            else:
+                column -= 1
+        return rowNums[column] if row < 0 else colNums[row]
+    for row in range(k):
+        images[colNums[row]-1] = exitLabel(row, shape[row]-1, False)
+    depth = k
+    for column in range(n-k):
+        while depth > 0 and shape[depth-1] <= column:
+            depth -= 1
+        label = rowNums[column]
+        images[label-1] = exitLabel(depth-1, column, True)
+        if images[label-1] == label:
+            loopMask |= elementMask(label)
+    return DecoratedPermutation(images, loopMask)
+
+#decoratedPermutationToNecklace, decoratedPermutationToLeDiagram:
+#Purpose: the Grassmann necklace (resp. Le diagram) of a decorated
+#   permutation
+def decoratedPermutationToNecklace(permutation):
+    return permutation.necklace()
+
+def decoratedPermutationToLeDiagram(permutation):
+    return permutation.leDiagram()
+
+####################################################
+#Positroid enumeration
+####################################################
+
+# PositroidRecord:
+# Purpose: One positroid of [n] of rank k, as produced by
+#          enumeratePositroids. The Le diagram and Grassmann necklace
+#          are stored, the bases are only built when asked for.
+#          leDiagram: the Le diagram (n,k,filledYoungTab)
+#          necklace: the Grassmann necklace (list of frozen sets)
+#          dimension: the number of +'s in the Le diagram, i.e. the
+#                     dimension of the positroid cell
+class PositroidRecord:
+    __slots__ = ("leDiagram", "necklace", "dimension")
+
+    def __init__(self, leDiagram, necklace):
+        self.leDiagram = leDiagram
+        self.necklace = necklace
+        self.dimension = sum(sum(part) for part in leDiagram[2])
+
+    # positroid:
+    # Purpose: the positroid as an ImplicitPositroid (no bases stored)
+    def positroid(self):
+        return ImplicitPositroid(self.necklace, VALIDATE_TRUSTED)
+
+    # bases:
+    # Purpose: the bases set of the positroid
+    def bases(self):
+        return set(iterPositroidBases(self.necklace, VALIDATE_TRUSTED))
+
+    # key:
+    # Purpose: the necklace as a NecklaceKey
+    def key(self):
+        return NecklaceKey(self.necklace)
+
+    def __repr__(self):
+        return f'PositroidRecord({self.leDiagram}, {self.necklace})'
+
+# enumeratePositroids:
+# Purpose: Generate every positroid of [n] of rank k, once each, without
+#          generating any matroids. The positroids are in bijection with
+#          the Le diagrams in a k*(n-k) box, so this walks
+#          iterLeDiagramViews and converts each diagram with leDiagramToGrassmannNecklace.
+# n,k: non-negative integers with k <= n
+# returns: generator of PositroidRecords
+def enumeratePositroids(n,k):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    for view in iterLeDiagramViews(n,k):
+        leDiagram = view.leDiagram()
+        yield PositroidRecord(leDiagram, leDiagramToGrassmannNecklace(leDiagram, VALIDATE_TRUSTED))
+
+# enumerateAllPositroids:
+# Purpose: Generate every positroid of [n], of every rank k = 0, ..., n.
+# n: non-negative integer
+# returns: generator of PositroidRecords
+def enumerateAllPositroids(n):
+    for k in range(n+1):
+        yield from enumeratePositroids(n,k)
+
+####################################################
+#Dihedral symmetry
+####################################################
+#Rotating [n] (i -> i+r) or reflecting it (i -> r-i) keeps the cyclic
+#order up to direction, so it maps positroids to positroids. On decorated
+#permutations a rotation g acts by conjugation, pi -> g pi g^-1, and a
+#reflection also reverses the permutation, pi -> g pi^-1 g^-1; loops go to
+#loops. The canonical form of an orbit is the member with the smallest
+#DecoratedPermutation.key(), so canonicalizing a necklace takes 2n
+#products of permutations of [n] and no bases.
+
+POSITROID_SYMMETRIES = ('cyclic', 'dihedral')
+
+# POSITROID_GROUP_CACHE_SIZE: the number of groups positroidSymmetryGroup keeps
+POSITROID_GROUP_CACHE_SIZE = 16
+
+#positroidSymmetryGroup:
+#Purpose: the rotations (and reflections) of [n], as in symmetryGroup
+#symmetry: 'cyclic' or 'dihedral'
+#returns: tuple of tuples, g[e-1] is the image of e
+@functools.lru_cache(maxsize=POSITROID_GROUP_CACHE_SIZE)
+def positroidSymmetryGroup(n, symmetry = 'dihedral'):
+    if symmetry not in POSITROID_SYMMETRIES:
+        raise ValueError(f'symmetry must be one of {POSITROID_SYMMETRIES}, not {symmetry!r}')
+    return tuple(symmetryGroup(n, symmetry))
+
+#inversePermutation:
+#Purpose: the inverse of a permutation g of [n], g[e-1] is the image of e
+def inversePermutation(g):
+    inverse = [0]*len(g)
+    for e, image in enumerate(g, 1):
+        inverse[image-1] = e
+    return tuple(inverse)
+
+#permuteDecoratedPermutation:
+#Purpose: the decorated permutation of g(M), where M is the positroid of
+#   decorated and g is a rotation or reflection of [n]
+#decorated: DecoratedPermutation
+#g: tuple, an element of positroidSymmetryGroup(n, 'dihedral')
+#returns: DecoratedPermutation
+def permuteDecoratedPermutation(decorated, g):
+    n = decorated.n
+    #for n <= 2 every reflection is also a rotation
+    reflection = n >= 3 and (g[1] - g[0]) % n != 1
+    source = inversePermutation(decorated.images) if reflection else decorated.images
+    images = [0]*n
+    for i in range(1, n+1):
+        images[g[i-1]-1] = g[source[i-1]-1]
+    return DecoratedPermutation(images, permuteMask(decorated.loopMask, g))
+
+#permuteNecklace:
+#Purpose: the Grassmann necklace of g(M), where M is the positroid of
+#   necklace and g is a rotation or reflection of [n]
+#necklace: list of frozen sets (or of bitmasks), a Grassmann necklace
+#validate: (optional) the validation level, see resolveValidation
+#returns: list of frozen sets
+def permuteNecklace(necklace, g, validate = None):
+    decorated = necklaceToDecoratedPermutation(necklace, validate)
+    return permuteDecoratedPermutation(decorated, g).necklace()
+
+#canonicalDecoratedPermutation:
+#Purpose: the canonical form of the orbit of a decorated permutation
+#decorated: DecoratedPermutation
+#symmetry: 'cyclic' or 'dihedral'
+#returns: (DecoratedPermutation, int, tuple) the canonical form, the size
+#   of the stabilizer of decorated, and a g taking decorated to the
+#   canonical form
+def canonicalDecoratedPermutation(decorated, symmetry = 'dihedral'):
+    ownKey = decorated.key()
+    best = None
+    bestKey = None
+    bestG = None
+    stabilizer = 0
+    for g in positroidSymmetryGroup(decorated.n, symmetry):
+        image = permuteDecoratedPermutation(decorated, g)
+        key = image.key()
+        if key == ownKey:
+            stabilizer += 1
+        if bestKey is None or key < bestKey:
+            best, bestKey, bestG = image, key, g
+    return (best, stabilizer, bestG)
+
+#canonicalNecklace:
+#Purpose: canonicalDecoratedPermutation for a Grassmann necklace
+#necklace: list of frozen sets (or of bitmasks), a Grassmann necklace
+#returns: (list of frozen sets, int, tuple) as in canonicalDecoratedPermutation
+def canonicalNecklace(necklace, symmetry = 'dihedral', validate = None):
+    decorated = necklaceToDecoratedPermutation(necklace, validate)
+    canonical, stabilizer, g = canonicalDecoratedPermutation(decorated, symmetry)
+    return (canonical.necklace(), stabilizer, g)
+
+# enumeratePositroidOrbits:
+# Purpose: Generate one positroid of [n] of rank k per orbit of the
+#          rotations (and reflections), the canonical one. Each Le diagram is
+#          read as a decorated permutation and kept only if no rotation
+#          or reflection of it has a smaller key, so no bases are built.
+# n,k: non-negative integers with k <= n
+# symmetry: 'cyclic' or 'dihedral'
+# returns: generator of (PositroidRecord, stabilizer size). The orbit of a
+#          record has len(positroidSymmetryGroup(n, symmetry)) // stabilizer
+#          positroids, and these add up to countLeDiagrams(n, k).
+def enumeratePositroidOrbits(n, k, symmetry = 'dihedral'):
+    if k < 0 or k > n:
+        raise ValueError(f'k = {k} must be in [0, {n}]')
+    group = positroidSymmetryGroup(n, symmetry)
+    for view in iterLeDiagramViews(n,k):
+        leDiagram = view.leDiagram()
+        decorated = leDiagramToDecoratedPermutation(leDiagram, VALIDATE_TRUSTED)
+        ownKey = decorated.key()
+        stabilizer = 0
+        for g in group:
+            key = permuteDecoratedPermutation(decorated, g).key()
+            if key < ownKey:
+                break
+            if key == ownKey:
+                stabilizer += 1
+        else:
+            yield (PositroidRecord(leDiagram, decorated.necklace()), stabilizer)
+
+# DihedralPositroidCache:
+# Purpose: Memoize a function of positroids once per orbit of the rotations
+#          (and reflections) of [n]. A query necklace is turned into the
+#          canonical necklace of its orbit, and compute only runs on
+#          canonical necklaces.
+#          compute: function of a Grassmann necklace (list of frozen sets)
+#          transform: (optional) function of (value, g) giving the value
+#                     for g(M) from the value for M. Without it the values
+#                     are taken to be invariant, like the dimension or the
+#                     number of bases.
+#          symmetry: 'cyclic' or 'dihedral'
+#          hits, misses: the number of queries answered from (resp. added
+#                        to) the cache
+class DihedralPositroidCache:
+    def __init__(self, compute, transform = None, symmetry = 'dihedral'):
+        #raises ValueError for an unknown symmetry
+        positroidSymmetryGroup(0, symmetry)
+        self.compute = compute
+        self.transform = transform
+        self.symmetry = symmetry
+        self.hits = 0
+        self.misses = 0
+        self._values = {}
+
+    def __call__(self, necklace, validate = None):
+        decorated = necklaceToDecoratedPermutation(necklace, validate)
+        canonical, stabilizer, g = canonicalDecoratedPermutation(decorated, self.symmetry)
+        key = canonical.key()
+        if key in self._values:
+            self.hits += 1
+            value = self._values[key]
+        else:
+            self.misses += 1
+            value = self.compute(canonical.necklace())
+            self._values[key] = value
+        if self.transform is None:
+            return value
+        return self.transform(value, inversePermutation(g))
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, necklace):
+        decorated = necklaceToDecoratedPermutation(necklace, VALIDATE_TRUSTED)
+        return canonicalDecoratedPermutation(decorated, self.symmetry)[0].key() in self._values
+
+    def clear(self):
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
 ####################################################
 #Testing
 ####################################################
@@ -865,7 +2653,7 @@ def positroidChordTex(positroidChord):
     print("\t\t\\draw (0,0) circle (1);")
     for i in range(n):
         print("\t\t\\filldraw [black] (" + strAngles[i] + ":1) circle (2pt);")
-        print("\t\t\draw (" + strAngles[i] + ":1.5) node {" + str(i+1) + "};")        
+        print("\t\t\\draw (" + strAngles[i] + ":1.5) node {" + str(i+1) + "};")        
 
     
     print("\t\\end{tikzpicture}")
@@ -874,6 +2662,9 @@ def positroidChordTex(positroidChord):
 ####################################################
 #BEGIN MAIN
 ####################################################
+#Nothing below runs on import. The timing and demo runs that used to
+#live here are now functions, run with
+#   python Positroids.py [counts|demo|importtime]
 
 ##n = 4
 ##k = 2
@@ -895,76 +2686,102 @@ def positroidChordTex(positroidChord):
 ##    printMatroid(k,positroid," , ","",True)
 ##    print("---------------------------------")
 
+# countingTimingRun:
+# Purpose: Time counting the positroids of [n] of rank k for all n < maxN,
+#   first by generating every matroid and collecting the distinct
+#   Grassmann necklaces, then by walking every Le diagram.
+# maxN: (int) the counts are done for n = 0, ..., maxN-1
+def countingTimingRun(maxN = 6):
+    start = timer()
+
+    #rangeCheck rejects the empty ground set, so the matroid counts start at n = 1
+    for n in range(1,maxN):
+        for k in range(n+1):
+            #iterMatroids only yields matroids, no need to check them again
+            myNecklaces = {NecklaceKey(basesToGrassmannNecklace(myMatroid,n,VALIDATE_TRUSTED)) for myMatroid in iterMatroids(n,k)}
+            print(len(myNecklaces),end = " ")
+        print("");
 
-start = timer()
-
-for n in range(6):
-    for k in range(n+1):
-        myMatroids = generateMatroids(n,k)
-        myNecklacess = [frozenset(basesToGrassmannNecklace(myMatroid,n)) for myMatroid in myMatroids]
-        res = []
-        [res.append(x) for x in myNecklacess if x not in res]
-        print(len(res),end = " ")
-    print("");
-
-end = timer()
-print(end - start)
-
-start = timer()
+    end = timer()
+    print(end - start)
 
-for n in range(6):
-    for k in range(n+1):
-        count = 0
-        currentObject = None
-        currentObject = nextLeDiagam(currentObject,n,k)
-        while currentObject is not None:
-            count += 1
-            currentObject = nextLeDiagam(currentObject,n,k)
-        print(f'{count:{" "}{7}}',end = " ")
-    print("");
+    start = timer()
 
-end = timer()
-print(end - start)
+    for n in range(maxN):
+        for k in range(n+1):
+            count = sum(1 for view in iterLeDiagramViews(n,k))
+            print(f'{count:{" "}{7}}',end = " ")
+        print("");
 
-youngTab = [[1,0,1,0],[0,0,1],[1,0]]
+    end = timer()
+    print(end - start)
 
-currentTab = None
-currentTab = nextYoungDiagram(3,2,currentTab)
-while currentTab is not None:
-    print(currentTab)
+# leDiagramDemo:
+# Purpose: Print the Young diagrams in a 3*2 box, the rows allowed
+#   under a mask, and every Le diagram of [n] of rank k with its
+#   Grassmann necklace and the Le diagram read back from the necklace.
+# n,k: non-negative integers, 0 <= k <= n
+def leDiagramDemo(n = 5, k = 2):
+    currentTab = None
     currentTab = nextYoungDiagram(3,2,currentTab)
+    while currentTab is not None:
+        print(currentTab)
+        currentTab = nextYoungDiagram(3,2,currentTab)
 
-mask = [0,1,0,1]
-currentRow = None
-currentRow = _nextPlusZeroRow(mask,currentRow)
-while currentRow is not None:
-    print(currentRow)
+    mask = [0,1,0,1]
+    currentRow = None
     currentRow = _nextPlusZeroRow(mask,currentRow)
-
-##youngTab = [2,1]
-##filledYoungTab = None
-##filledYoungTab = nextFilledYoungTabOfShape(filledYoungTab,youngTab)
-##while filledYoungTab is not None:
-##    leDiagramASCII((4,2,filledYoungTab))
-##    printGrassmannNecklace(4,2,leDiagramToGrassmannNecklace((4,2,filledYoungTab)),True," , ","",False)
-##    filledYoungTab = nextFilledYoungTabOfShape(filledYoungTab,youngTab)
-##
-##unitTest1()
-
-
-n=5
-k=2
-currentObject = None
-currentObject = nextLeDiagam(currentObject,n,k)
-while currentObject is not None:
-    leDiagramASCII(currentObject)
-    myNecklace = leDiagramToGrassmannNecklace(currentObject)
-    printGrassmannNecklace(5,2,myNecklace,True," , ","",False)
-    myLeDiagram = grassmannNecklaceToLeDiagram(5,2,myNecklace)
-    leDiagramASCII(myLeDiagram)
+    while currentRow is not None:
+        print(currentRow)
+        currentRow = _nextPlusZeroRow(mask,currentRow)
+
+    ##youngTab = [2,1]
+    ##filledYoungTab = None
+    ##filledYoungTab = nextFilledYoungTabOfShape(filledYoungTab,youngTab)
+    ##while filledYoungTab is not None:
+    ##    leDiagramASCII((4,2,filledYoungTab))
+    ##    printGrassmannNecklace(4,2,leDiagramToGrassmannNecklace((4,2,filledYoungTab)),True," , ","",False)
+    ##    filledYoungTab = nextFilledYoungTabOfShape(filledYoungTab,youngTab)
+    ##
+    ##unitTest1()
+
+    currentObject = None
     currentObject = nextLeDiagam(currentObject,n,k)
-    print("--------------------------------------------")
-    print("--------------------------------------------")
+    while currentObject is not None:
+        leDiagramASCII(currentObject)
+        myNecklace = leDiagramToGrassmannNecklace(currentObject)
+        printGrassmannNecklace(n,k,myNecklace,True," , ","",False)
+        myLeDiagram = grassmannNecklaceToLeDiagram(n,k,myNecklace)
+        leDiagramASCII(myLeDiagram)
+        currentObject = nextLeDiagam(currentObject,n,k)
+        print("--------------------------------------------")
+        print("--------------------------------------------")
+
+# importTimeBenchmark:
+# Purpose: Guard against import-time regressions. Imports this module
+#   in fresh interpreters and checks that the best time stays under
+#   the given budget, so worker processes can import it cheaply.
+# maxSeconds: (float) the allowed import time
+# repeats: (int) the number of fresh interpreters to time
+# returns: (float) the best import time in seconds
+def importTimeBenchmark(maxSeconds = 0.5, repeats = 5):
+    import os
+    import subprocess
+    moduleDir = os.path.dirname(os.path.abspath(__file__))
+    #Time only the import, not the start up of the interpreter itself.
+    script = "from timeit import default_timer as timer\nstart = timer()\nimport Positroids\nprint(timer() - start)"
+    times = []
+    for i in range(repeats):
+        result = subprocess.run([sys.executable, "-c", script], cwd = moduleDir,
+                                capture_output = True, text = True, check = True)
+        if result.stdout.strip().count("\n") != 0:
+            raise RuntimeError(f"importing Positroids printed output:\n{result.stdout}")
+        times.append(float(result.stdout))
+    bestTime = min(times)
+    print(f"import Positroids: {bestTime:.4f}s (budget {maxSeconds}s)")
+    if bestTime > maxSeconds:
+        raise RuntimeError(f"importing Positroids took {bestTime:.4f}s, over the {maxSeconds}s budget")
+    return bestTime
 
 ##n=4
 ##k=2
@@ -1002,5 +2819,15 @@ while currentObject is not None:
 #leDiagramTex((5,2,[[1,0,1],[1,1,1]]))
 
 #positroidChordTex((11,[[1,2],[2,3],[3,4],[6,9,10]]))
-    
- '''
\ No newline at end of file
+
+if __name__ == "__main__":
+    runs = sys.argv[1:] if len(sys.argv) > 1 else ["counts", "demo"]
+    for run in runs:
+        if run == "counts":
+            countingTimingRun()
+        elif run == "demo":
+            leDiagramDemo()
+        elif run == "importtime":
+            importTimeBenchmark()
+        else:
+            raise SystemExit(f"unknown run {run}, expected counts, demo or importtime")
@@ -0,0 +1,298 @@
+#Note: This program was written for Python 3.
+#Purpose: Brute force cross-checks of the fast matroid and positroid code.
+#Each test recomputes a result straight from the definitions over every
+#small case (or every small Le diagram) and compares. Run with
+#   python -m unittest test_positroids
+#or with pytest.
+
+import itertools
+import os
+import random
+import subprocess
+import sys
+import unittest
+import warnings
+
+from Positroids import *
+
+####################################################
+#Brute force helpers
+####################################################
+
+#kSubsets:
+#Purpose: every k element subset of [n], as frozen sets
+def kSubsets(n, k):
+    return [frozenset(subset) for subset in itertools.combinations(range(1, n+1), k)]
+
+#allLeDiagrams:
+#Purpose: every Le diagram (n,k,filledYoungTab) with n <= maxN
+def allLeDiagrams(maxN):
+    for n in range(maxN+1):
+        for k in range(n+1):
+            for view in iterLeDiagramViews(n, k):
+                yield view.leDiagram()
+
+#normalLeDiagram:
+#Purpose: a Le diagram with its empty parts dropped, since the
+#   degenerate cases (k = 0 or k = n) come back with or without them
+def normalLeDiagram(leDiagram):
+    n, k, filledYoungTab = leDiagram
+    return (n, k, [part for part in filledYoungTab if part])
+
+#galeAtLeast:
+#Purpose: check B >=_i I in the Gale order: with both sorted in the <_i
+#   order, every element of B is at least the matching element of I
+def galeAtLeast(basis, element, n, i):
+    shiftedBasis = sorted((e - i) % n for e in basis)
+    shiftedElement = sorted((e - i) % n for e in element)
+    return all(b >= a for b, a in zip(shiftedBasis, shiftedElement))
+
+#exchangeHolds:
+#Purpose: the basis exchange axiom straight from its definition: for all
+#   bases A, B and every a in A \ B there is a b in B \ A with
+#   (A \ {a}) cup {b} a basis
+def exchangeHolds(family):
+    return all(any((A - {a}) | {b} in family for b in B - A)
+               for A in family for B in family for a in A - B)
+
+#circuitAxiomsHold:
+#Purpose: the circuit axioms straight from their definitions: no empty
+#   circuit, no circuit inside another, and for circuits C1 != C2 and
+#   e in C1 cap C2 some circuit inside (C1 cup C2) \ {e}
+def circuitAxiomsHold(family):
+    if frozenset() in family:
+        return False
+    if any(C1 < C2 for C1 in family for C2 in family):
+        return False
+    return all(any(C3 <= (C1 | C2) - {e} for C3 in family)
+               for C1 in family for C2 in family if C1 != C2 for e in C1 & C2)
+
+#matroidCircuits:
+#Purpose: the circuits of a matroid given by its bases, straight from the
+#   definition: the minimal sets that are in no basis
+def matroidCircuits(bases, n):
+    independent = {frozenset(subset) for basis in bases
+                   for size in range(len(basis)+1) for subset in itertools.combinations(basis, size)}
+    dependent = [frozenset(subset) for size in range(1, n+1)
+                 for subset in itertools.combinations(range(1, n+1), size)
+                 if frozenset(subset) not in independent]
+    return {C for C in dependent if not any(D < C for D in dependent)}
+
+####################################################
+#Import (user-002)
+####################################################
+
+class ImportTest(unittest.TestCase):
+    # importing Positroids in a fresh interpreter prints nothing, warns
+    # nothing, and builds none of the cached tables
+    def testImportHasNoSideEffects(self):
+        script = "\n".join([
+            "import Positroids",
+            "from Positroids import _leCompletionTable, _leShapeOffsets, _leFillingCounts, _internedNecklaceKeys",
+            "tables = [Positroids.galeRankTable, _leCompletionTable, _leShapeOffsets, _leFillingCounts,",
+            "          Positroids.positroidSymmetryGroup]",
+            "import sys",
+            "sys.stderr.write(repr([table.cache_info().currsize for table in tables] + [len(_internedNecklaceKeys)]))"])
+        result = subprocess.run([sys.executable, "-c", script], capture_output = True, text = True, check = True,
+                                cwd = os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout, "")
+        self.assertEqual(result.stderr, repr([0]*6))
+
+    # the import stays cheap, with a generous budget for slow machines
+    def testImportTime(self):
+        self.assertLess(importTimeBenchmark(maxSeconds = 5, repeats = 1), 5)
+
+####################################################
+#Positroid bases (user-004)
+####################################################
+
+class PositroidBasesTest(unittest.TestCase):
+    # the bases of the positroid of a necklace are the k-subsets that are
+    # >=_i I_i in the Gale order for every i
+    def testBasesMatchGaleDefinition(self):
+        for leDiagram in allLeDiagrams(6):
+            n, k = leDiagram[0], leDiagram[1]
+            if n == 0:
+                continue
+            necklace = leDiagramToGrassmannNecklace(leDiagram)
+            expected = {basis for basis in kSubsets(n, k)
+                        if all(galeAtLeast(basis, necklace[i-1], n, i) for i in range(1, n+1))}
+            self.assertEqual(grassmannNecklaceToPositroid(necklace), expected, leDiagram)
+            self.assertEqual(set(iterPositroidBases(necklace)), expected, leDiagram)
+            self.assertEqual(len(ImplicitPositroid(necklace)), len(expected), leDiagram)
+
+    # the necklace of the positroid is the necklace it was built from
+    def testNecklaceRoundTrip(self):
+        for leDiagram in allLeDiagrams(6):
+            n = leDiagram[0]
+            if n == 0 or leDiagram[1] == 0:
+                continue
+            necklace = leDiagramToGrassmannNecklace(leDiagram)
+            self.assertEqual(basesToGrassmannNecklace(grassmannNecklaceToPositroid(necklace), n), necklace)
+
+####################################################
+#Basis exchange (user-006)
+####################################################
+
+class BasisExchangeTest(unittest.TestCase):
+    # isMatroidBases agrees with the exchange axiom on every family of
+    # k-subsets of [n] with at most 10 members to choose from
+    def testEveryFamily(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for n in range(1, 6):
+                for k in range(n+1):
+                    subsets = kSubsets(n, k)
+                    for size in range(len(subsets)+1):
+                        for members in itertools.combinations(subsets, size):
+                            family = set(members)
+                            expected = exchangeHolds(family)
+                            self.assertEqual(isMatroidBases(family), expected, family)
+                            witness = basisExchangeWitness(family)
+                            self.assertEqual(witness is None, expected, family)
+                            if witness is not None:
+                                A, B, a = witness
+                                self.assertTrue(A in family and B in family and a in A - B)
+                                self.assertFalse(any((A - {a}) | {b} in family for b in B - A))
+
+    # the distinct necklaces of the matroids are the positroids, so there is
+    # one per Le diagram
+    def testMatroidNecklaceCounts(self):
+        for n in range(1, 6):
+            for k in range(n+1):
+                necklaces = {NecklaceKey(basesToGrassmannNecklace(matroid, n)) for matroid in generateMatroids(n, k)}
+                self.assertEqual(len(necklaces), countLeDiagrams(n, k), (n, k))
+
+####################################################
+#Matroid closure (user-007)
+####################################################
+
+class MatroidClosureTest(unittest.TestCase):
+    # on random clutters the closure is a circuit set, and every set given
+    # to it stays dependent (contains one of its circuits)
+    def testRandomClutters(self):
+        rng = random.Random(7)
+        for trial in range(400):
+            n = rng.randint(1, 6)
+            candidates = [frozenset(subset) for size in range(1, n+1)
+                          for subset in itertools.combinations(range(1, n+1), size)]
+            chosen = rng.sample(candidates, rng.randint(1, min(6, len(candidates))))
+            clutter = {C for C in chosen if not any(D < C for D in chosen)}
+            closure = matroidClosure(clutter)
+            self.assertTrue(circuitAxiomsHold(closure), (clutter, closure))
+            for C in clutter:
+                self.assertTrue(any(D <= C for D in closure), (clutter, closure))
+
+####################################################
+#Le diagrams and decorated permutations (user-017)
+####################################################
+
+class LeDiagramRoundTripTest(unittest.TestCase):
+    # necklace -> Le diagram gives back the diagram the necklace came from
+    def testNecklaceToLeDiagram(self):
+        self.assertEqual(grassmannNecklaceToLeDiagram(4, 3, leDiagramToGrassmannNecklace((4,3,[[0],[],[]]))),
+                         (4,3,[[0],[],[]]))
+        for leDiagram in allLeDiagrams(7):
+            n, k = leDiagram[0], leDiagram[1]
+            necklace = leDiagramToGrassmannNecklace(leDiagram)
+            self.assertEqual(normalLeDiagram(grassmannNecklaceToLeDiagram(n, k, necklace)),
+                             normalLeDiagram(leDiagram))
+
+    # the decorated permutation read off the pipe dream is the one of the
+    # necklace, and converts back to the same necklace and Le diagram
+    def testDecoratedPermutations(self):
+        for leDiagram in allLeDiagrams(7):
+            necklace = leDiagramToGrassmannNecklace(leDiagram)
+            permutation = leDiagramToDecoratedPermutation(leDiagram)
+            self.assertEqual(permutation, necklaceToDecoratedPermutation(necklace), leDiagram)
+            self.assertEqual(permutation.necklace(), necklace, leDiagram)
+            self.assertEqual(normalLeDiagram(permutation.leDiagram()), normalLeDiagram(leDiagram))
+            self.assertEqual(permutation.dimension(), sum(sum(part) for part in leDiagram[2]), leDiagram)
+            self.assertEqual(DecoratedPermutation.fromKey(permutation.key()), permutation)
+
+####################################################
+#Positroid envelopes (user-018)
+####################################################
+
+class PositroidEnvelopeTest(unittest.TestCase):
+    # on random small matroids the batch agrees with one call per family
+    # and with the number of +'s of the Le diagram of the necklace
+    def testBatchMatchesLeDiagram(self):
+        rng = random.Random(18)
+        for n in range(1, 6):
+            for k in range(n+1):
+                matroids = list(iterMatroids(n, k))
+                sample = [rng.choice(matroids) for trial in range(8)]
+                circuits = [matroidCircuits(bases, n) for bases in sample]
+                expected = [sum(sum(part) for part in grassmannNecklaceToLeDiagram(n, k, basesToGrassmannNecklace(bases, n))[2])
+                            for bases in sample]
+                self.assertEqual(positroidEnvelopeDimensions(sample, n, 'bases'), expected, (n, k))
+                self.assertEqual(positroidEnvelopeDimensions(circuits, n), expected, (n, k))
+                self.assertEqual([positroidEnvelopeDimension(bases, n, 'bases') for bases in sample], expected)
+                self.assertEqual([positroidEnvelopeDimension(family, n) for family in circuits], expected)
+
+    # an invalid family is rejected wherever it is in the batch
+    def testInvalidFamilyAnywhere(self):
+        goodCircuits = {frozenset({1,2,3})}
+        badCircuits = {frozenset({1,2}), frozenset({2,3})}
+        goodBases = {frozenset({1,2})}
+        badBases = {frozenset({1,2}), frozenset({3,4})}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for position in range(3):
+                batch = [goodCircuits]*2
+                batch.insert(position, badCircuits)
+                with self.assertRaises(ValueError):
+                    positroidEnvelopeDimensions(batch, 4)
+                batch = [goodBases]*2
+                batch.insert(position, badBases)
+                with self.assertRaises(ValueError):
+                    positroidEnvelopeDimensions(batch, 4, 'bases')
+
+####################################################
+#Dihedral symmetry (user-024)
+####################################################
+
+class DihedralSymmetryTest(unittest.TestCase):
+    # moving the bases by a rotation or reflection and taking their
+    # necklace agrees with moving the necklace, and keeps the canonical form
+    def testActionMatchesBases(self):
+        for n in range(1, 7):
+            group = positroidSymmetryGroup(n, 'dihedral')
+            for k in range(n+1):
+                for record in enumeratePositroids(n, k):
+                    bases = record.bases()
+                    canonical = canonicalNecklace(record.necklace)[0]
+                    for g in group:
+                        moved = {frozenset(g[e-1] for e in basis) for basis in bases}
+                        necklace = basesToGrassmannNecklace(moved, n)
+                        self.assertEqual(permuteNecklace(record.necklace, g), necklace, (record, g))
+                        self.assertEqual(canonicalNecklace(necklace)[0], canonical, (record, g))
+
+    # one representative per orbit, and the orbit sizes add up to the
+    # number of positroids
+    def testOrbits(self):
+        for n in range(7):
+            for k in range(n+1):
+                for symmetry in POSITROID_SYMMETRIES:
+                    group = positroidSymmetryGroup(n, symmetry)
+                    orbits = list(enumeratePositroidOrbits(n, k, symmetry))
+                    self.assertEqual(sum(len(group) // stabilizer for record, stabilizer in orbits),
+                                     countLeDiagrams(n, k), (n, k, symmetry))
+                    canonicalForms = {NecklaceKey(canonicalNecklace(record.necklace, symmetry)[0])
+                                      for record in enumeratePositroids(n, k)}
+                    self.assertEqual({record.key() for record, stabilizer in orbits}, canonicalForms)
+
+    # the cache answers every rotation and reflection from one computation
+    # per orbit
+    def testCache(self):
+        moveBases = lambda bases, g: {frozenset(g[e-1] for e in basis) for basis in bases}
+        cache = DihedralPositroidCache(lambda necklace: set(iterPositroidBases(necklace)), moveBases)
+        records = list(enumeratePositroids(6, 3))
+        for record in records:
+            self.assertEqual(cache(record.necklace), record.bases())
+        self.assertEqual(cache.misses, len(list(enumeratePositroidOrbits(6, 3))))
+        self.assertEqual(cache.hits + cache.misses, len(records))
+
+if __name__ == '__main__':
+    unittest.main()